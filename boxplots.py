@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -11,16 +12,18 @@ stark = pd.read_csv(stark_path)
 zekra = pd.read_csv(zekra_path)
 
 # -------------------------------------------------------------------
-# 2. Normalize system labels
-#    Convert any "Groth16" to "ZEKRA"
+# 2. Concatenate
 # -------------------------------------------------------------------
-stark["system"] = stark["system"].replace({"Groth16": "ZEKRA"})
-zekra["system"] = zekra["system"].replace({"Groth16": "ZEKRA"})
+data = pd.concat([stark, zekra], ignore_index=True)
 
 # -------------------------------------------------------------------
-# 3. Concatenate
+# 3. Normalize system labels
+#    Store system as a category and rename "Groth16" to "ZEKRA"
+#    on the categories, not on every row
 # -------------------------------------------------------------------
-data = pd.concat([stark, zekra], ignore_index=True)
+data["system"] = data["system"].astype("category")
+if "Groth16" in data["system"].cat.categories:
+    data["system"] = data["system"].cat.rename_categories({"Groth16": "ZEKRA"})
 
 # system labels expected now:
 systems = ["STARKRA", "ZEKRA"]
@@ -28,15 +31,26 @@ systems = ["STARKRA", "ZEKRA"]
 print("System labels found:", data["system"].unique())
 
 # -------------------------------------------------------------------
-# 4. Helper function: boxplot generator
+# 4. Split by system once
+#    {system: {metric: ndarray}} so every plot reuses the same columns
+# -------------------------------------------------------------------
+metrics = ["prover_time_ms", "verifier_time_ms", "proof_bits"]
+
+groups = {
+    system: {metric: g[metric].to_numpy(copy=False) for metric in metrics}
+    for system, g in data.groupby("system", observed=True, sort=False)
+}
+
+# -------------------------------------------------------------------
+# 5. Helper function: boxplot generator
 # -------------------------------------------------------------------
 def boxplot_metric(metric, filename, ylabel):
     plt.figure()
 
-    group_data = [
-        data.loc[data["system"] == systems[0], metric].dropna(),
-        data.loc[data["system"] == systems[1], metric].dropna(),
-    ]
+    group_data = []
+    for system in systems:
+        arr = groups[system][metric]
+        group_data.append(arr[~np.isnan(arr)])
 
     plt.boxplot(group_data, labels=systems)
     plt.ylabel(ylabel)
@@ -47,7 +61,7 @@ def boxplot_metric(metric, filename, ylabel):
     print(f"Saved {filename}")
 
 # -------------------------------------------------------------------
-# 5. Generate boxplots for each log10-transformed metric
+# 6. Generate boxplots for each log10-transformed metric
 # -------------------------------------------------------------------
 
 # Prover time
@@ -1,108 +1,124 @@
-from networkx.classes import neighbors
+from array import array
+from dataclasses import dataclass
 
 from algebra import FieldElement, Field
 from multivariate import MPolynomial
-
+from cfg import node_element
+
+#Kinds of execution step, as stored in the type column
+JMP, CALL, RET, START = 0, 1, 2, 3
+TYPE_CODES = {"jmp": JMP, "call": CALL, "ret": RET, "start": START}
+
+#An execution path stored as parallel columns, one entry per step.
+#The first step is the start node itself, with type START
+@dataclass
+class Execution:
+    start: FieldElement
+    end: FieldElement
+    types: array
+    dests: array
+    returns: array
+
+    def __len__(self):
+        return len(self.types)
+
+#Shadow stack scan over the int columns of an execution.
+#Returns the call_stack, call, ret and next node columns. The last step
+#only records the top of the stack, it never flags a call or a matched return.
+def shadow_stack_scan(types, dests, returns):
+    num_steps = len(types)
+    call_stack_col = [0] * num_steps
+    call_col = [0] * num_steps
+    ret_col = [0] * num_steps
+    next_col = list(dests[1:]) + [0]
+    #Preallocated stack, sp is the number of live entries
+    stack = [0] * num_steps
+    sp = 0
+    last = num_steps - 1
+    for i in range(num_steps):
+        kind = types[i]
+        top = stack[sp-1] if sp else 0
+        if kind == CALL:
+            top = returns[i]
+            stack[sp] = top
+            sp += 1
+            if i != last:
+                call_col[i] = 1
+        elif kind == RET:
+            if sp == 0:
+                ret_col[i] = 1
+            elif top == dests[i]:
+                sp -= 1
+                top = stack[sp-1] if sp else 0
+                if i != last:
+                    ret_col[i] = 1
+        call_stack_col[i] = top
+    return call_stack_col, call_col, ret_col, next_col
 
 class Attestation:
+    #Shared constant polynomial, MPolynomial operations never mutate it
+    ONE_POLY = MPolynomial.constant(Field.main().one())
+
     def __init__(self, cfg):
         self.cfg = cfg
         self.max_adjacency = self.calculate_max_adjacency()
         self.num_registers = 7 + self.max_adjacency
         self.field = Field.main()
+        self.padded_neighbours = self.build_padded_neighbours()
         self.start = self.field.zero()
         self.end = self.field.zero()
         self.nonce = self.field.zero()
         self.num_cycles = 0
 
     def calculate_max_adjacency(self):
-        max_adjacency = 0
-        for node in self.cfg:
-            if len(self.cfg[node]) > max_adjacency:
-                max_adjacency = len(self.cfg[node])
-        return max_adjacency
+        return max(map(len, self.cfg.values()), default=0)
     def calculate_max_node_value(self):
-        max_node_value = 0
-        for node in self.cfg:
-            if node > max_node_value:
-                max_node_value = node
+        max_node_value = max(self.cfg, default=0)
         self.max_node_value = FieldElement(max_node_value, self.field)
         return max_node_value + 1
 
+    #Neighbours of every node as field elements, padded with zeros to max_adjacency
+    def build_padded_neighbours(self):
+        padded_neighbours = {}
+        for node in self.cfg:
+            neighbours = (self.cfg[node] + [0] * (self.max_adjacency - len(self.cfg[node])))[:self.max_adjacency]
+            padded_neighbours[node] = tuple(node_element(neighbour) for neighbour in neighbours)
+        return padded_neighbours
+
     def trace(self, nonce, start, end, execution, add_false_path=False):
         self.start = start
         self.end = end
         self.nonce = nonce
         self.execution = execution
-        state = []
-        stack = []
-        call = self.field.zero()
-        ret  = self.field.zero()
-        #Create first state
-        state += [[self.field.zero(), self.field.zero(), self.field.zero()] + [self.field.zero()] * self.max_adjacency + [self.field.zero(), self.field.zero(), self.field.zero(), self.field.one()]]
-
-        initial = self.field.zero()
-        end_node = self.field.zero()
+        field = self.field
+        dest_ids = execution.dests
+        call_stack_col, call_col, ret_col, next_ids = shadow_stack_scan(execution.types, dest_ids, execution.returns)
+        last = len(execution) - 1
+
+        #Wrap into field elements only once the columns are complete
+        zero = field.zero()
+        one = field.one()
+        initial = zero
         #[nonce, current, next, neighbour1, neighbour2, neighbour3, neighbour4, ..., neighbourN, call_stack, call, return, initial, end]
-        for i in range(len(execution)-1):
-            #Get the current node
-            current_node = execution[i]["dest"]
-            #Get the next node
-            next_node = execution[i+1]["dest"]
-            #Get the neighbours of the current node
-            neighbours = self.get_padded_neighbours(self.cfg, current_node, self.max_adjacency)
-            #Shadow stack
-            if len(stack) == 0:
-                call_stack_v = self.field.zero()
-            else:
-                call_stack_v = stack[0]
-
-            if execution[i]["type"] == "call":
-                stack = [ execution[i]["return"]] + stack
-                call_stack_v = stack[0]
-                call = self.field.one()
-            elif execution[i]["type"] == "ret":
-                if len(stack) == 0:
-                    ret = self.field.one()
-                elif stack[0] == current_node:
-                    stack = stack[1:]
-                    if len(stack) == 0:
-                        call_stack_v = self.field.zero()
-                    else:
-                        call_stack_v = stack[0]
-                    ret = self.field.one()
-            #Create the state
-            neighbours = [FieldElement(neighbour, self.field) for neighbour in neighbours]
-            state += [[nonce, current_node, next_node ] + neighbours + [call_stack_v, call, ret, initial, end]]
-            #Reset call and ret
-            call = self.field.zero()
-            ret = self.field.zero()
+        #One row ahead of the execution for the initial state
+        num_cycles = len(execution) + 1
+        state = [None] * num_cycles
+        #Create first state
+        state[0] = [zero, zero, zero] + [zero] * self.max_adjacency + [zero, zero, zero, one]
+        #Wrap each column in one pass, the flag columns only hold zero or one
+        flags = (zero, one)
+        currents = [node_element(node) for node in dest_ids]
+        nexts = [node_element(node) for node in next_ids]
+        call_stacks = [node_element(node) for node in call_stack_col]
+        calls = [flags[flag] for flag in call_col]
+        rets = [flags[flag] for flag in ret_col]
+        padded_neighbours = self.padded_neighbours
+        for i in range(last):
+            state[i+1] = [nonce, currents[i], nexts[i], *padded_neighbours[dest_ids[i]], call_stacks[i], calls[i], rets[i], initial, end]
         #Add the last state
-        current_node = execution[-1]["dest"]
-        next_node = self.field.zero()
-        neighbours = [self.field.zero()] * self.max_adjacency
-        call_stack_v = self.field.zero()
-        if len(stack) == 0:
-            call_stack_v = self.field.zero()
-        else:
-            call_stack_v = stack[0]
-
-        if execution[-1]["type"] == "call":
-            stack = [ execution[-1]["return"]] + stack
-            call_stack_v = stack[0]
-        elif execution[-1]["type"] == "ret":
-            if len(stack) == 0:
-                ret = self.field.one()
-            elif stack[0] == current_node:
-                stack = stack[1:]
-                if len(stack) == 0:
-                    call_stack_v = self.field.zero()
-                else:
-                    call_stack_v = stack[0]
-        end_node = self.field.one()
-        state += [[nonce, current_node, next_node ] + neighbours + [call_stack_v, call, ret, initial]]
-
-        self.num_cycles = len(state)
+        state[last+1] = [nonce, currents[last], zero] + [zero] * self.max_adjacency + [call_stacks[last], zero, rets[last], initial]
+
+        self.num_cycles = num_cycles
 
 
         return state
@@ -127,9 +143,9 @@ class Attestation:
         return constraints
 
     def get_valid_transition_polynomial(self, next_state, neighbours):
-        acc = MPolynomial.constant(self.field.one())
+        acc = self.ONE_POLY
         for neighbour in neighbours:
-            acc *= (neighbour - next_state)
+            acc = acc.mul_sparse_linear(neighbour - next_state)
         return acc
 
 
@@ -143,20 +159,18 @@ class Attestation:
         call_stack_index = neighbor_start_index + self.max_adjacency
         air = []
         field = self.field
+        #Check that is not the initial state
+        initial_pol = self.ONE_POLY - previous_state[-1]
+
         # Check that the transition was performed correctly
         lhs = previous_state[2]
         rhs = next_state[1]
-
-        #Check that is not the initial state
-        initial_pol = MPolynomial.constant(self.field.one()) - previous_state[-1]
         air += [(lhs-rhs)*(initial_pol)]
 
         #Check valid next state transition (forward)
         current_neighbours = previous_state[neighbor_start_index:neighbor_start_index+self.max_adjacency]
         next_node = previous_state[2]
         valid_next_state = self.get_valid_transition_polynomial(next_node, current_neighbours)
-        #Check that is not the initial state
-        initial_pol = MPolynomial.constant(self.field.one()) - previous_state[-1]
         air += [valid_next_state*(initial_pol)]
 
         #Check stack consistency (backwards)
@@ -170,6 +184,4 @@ class Attestation:
 
     def get_padded_neighbours(self, cfg, node, max_adjacency):
         neighbours = cfg[node.value]
-        if len(neighbours) < max_adjacency:
-            neighbours += [0] * (max_adjacency - len(neighbours))
-        return neighbours[:max_adjacency]
+        return (neighbours + [0] * (max_adjacency - len(neighbours)))[:max_adjacency]
@@ -44,6 +44,15 @@ class FieldElement:
                 acc = acc * val
         return acc
 
+    # [first, first*self, first*self^2, ...] with one multiplication per term
+    def geometric_sequence( self, length, first=None ):
+        acc = self.field.one() if first is None else first
+        sequence = [None] * length
+        for i in range(length):
+            sequence[i] = acc
+            acc = acc * self
+        return sequence
+
     def __eq__( self, other ):
         return self.value == other.value
 
@@ -88,6 +97,23 @@ class Field:
         a, b, g = xgcd(operand.value, self.p)
         return FieldElement(((a % self.p) + self.p) % self.p, self)
 
+    # Montgomery's trick: invert all elements with a single inversion and
+    # 3(n-1) multiplications
+    def batch_inverse( self, elements ):
+        if len(elements) == 0:
+            return []
+        prefix = [elements[0]]
+        for e in elements[1:]:
+            prefix += [prefix[-1] * e]
+        assert(not prefix[-1].is_zero()), "cannot batch invert zero"
+        acc = prefix[-1].inverse()
+        inverses = [None] * len(elements)
+        for i in reversed(range(1, len(elements))):
+            inverses[i] = acc * prefix[i-1]
+            acc = acc * elements[i]
+        inverses[0] = acc
+        return inverses
+
     def divide( self, left, right ):
         assert(not right.is_zero()), "divide by zero"
         a, b, g = xgcd(right.value, self.p)
@@ -13,6 +13,14 @@ from merkle import *
 from rescue_prime import *
 
 
+#Product of a non-empty list of polynomials, multiplied pairwise as a balanced
+#tree so the intermediate products stay small
+def tree_product(factors):
+    if len(factors) == 1:
+        return factors[0]
+    mid = len(factors) // 2
+    return tree_product(factors[:mid]) * tree_product(factors[mid:])
+
 
 class Attestation:
     def __init__(self, cfg):
@@ -20,6 +28,11 @@ class Attestation:
         self.cycle_num = 0
         self.registers = 11
         self.rp = RescuePrime()
+        #Memoized Rescue-Prime digests, keyed by node id and by (src, dest) edge
+        self.node_hashes = {}
+        self.edge_hashes = {}
+        #Values of self.hash_transitions, built on the first is_valid call
+        self.hash_transition_set = None
         #self.hash_transitions = self.get_list_hash_transitions()
         self.field = Field.main()
         #self.valid_check_poly = self.valid_poly()
@@ -35,19 +48,27 @@ class Attestation:
             dests = self.cfg[src]
             for dest in dests:
                 transitions.add((src, dest))
-        hash_transitions = []
+        node_hashes = self.hash_nodes([node for transition in transitions for node in transition])
         for transition in transitions:
-            src = FieldElement(transition[0], Field.main())
-            dest = FieldElement(transition[1], Field.main())
-            hash_transitions.append(self.hash_trans([src, dest]))
-        return hash_transitions
+            if transition not in self.edge_hashes:
+                self.edge_hashes[transition] = node_hashes[transition[0]] + node_hashes[transition[1]]
+        return [self.edge_hashes[transition] for transition in transitions]
+
+    #Hash every node id not seen yet in one batch, returns the memo table
+    def hash_nodes(self, nodes):
+        missing = [node for node in set(nodes) if node not in self.node_hashes]
+        digests = self.rp.hash_batch([FieldElement(node, self.field) for node in missing])
+        self.node_hashes.update(zip(missing, digests))
+        return self.node_hashes
     def create_trace(self, path, nonce = 0, padding_value = 0, falsify_path_list=[]):
-        trace = [FieldElement(nonce, Field.main())] + [FieldElement(node, Field.main()) for node in path]
-        bytes_hashes = [blake2b(bytes(str(element.value).encode("UTF-8"))).hexdigest() for element in trace]
+        field = Field.main()
+        trace = [FieldElement(nonce, field)] + [FieldElement(node, field) for node in path]
+        #Raw 16 byte digests of the little-endian values, reduced into the field at the end
+        bytes_hashes = [blake2b(element.value.to_bytes(16, "little"), digest_size=16).digest() for element in trace]
         random_index_to_append_falsify = random.randint(0, len(bytes_hashes)-1)
-        hash_false_path = [blake2b(bytes(str(element.value).encode("UTF-8"))).hexdigest() for element in falsify_path_list]
+        hash_false_path = [blake2b(element.value.to_bytes(16, "little"), digest_size=16).digest() for element in falsify_path_list]
         bytes_hashes = bytes_hashes[:random_index_to_append_falsify] + hash_false_path + bytes_hashes[random_index_to_append_falsify:]
-        hash_trace = [FieldElement(int.from_bytes(bytes(bytes_hash, "UTF-8")), Field.main()) for bytes_hash in bytes_hashes]
+        hash_trace = [FieldElement(int.from_bytes(bytes_hash, "little") % field.p, field) for bytes_hash in bytes_hashes]
 
         return hash_trace
 
@@ -71,13 +92,15 @@ class Attestation:
         var = variables[1:(1+self.registers)]
         poly = var[3]
         field = Field.main()
-        acc = MPolynomial.constant(field.one())
-        for hash in self.hash_transitions:
-            acc *= (poly-MPolynomial.constant(hash))
-        return acc
+        factors = [poly-MPolynomial.constant(hash) for hash in self.hash_transitions]
+        if len(factors) == 0:
+            return MPolynomial.constant(field.one())
+        return tree_product(factors)
 
     def is_valid(self, hash_transition):
-        if hash_transition in self.hash_transitions:
+        if self.hash_transition_set is None:
+            self.hash_transition_set = frozenset(h.value for h in self.hash_transitions)
+        if hash_transition.value in self.hash_transition_set:
             return Field.main().one()
         else:
             return Field.main().zero()
@@ -90,93 +113,102 @@ class Attestation:
             execution = path
         state = []
         self.registers = 11
-        self.start = FieldElement(int(execution["start"]), Field.main())
-        self.end = FieldElement(int(execution["end"]), Field.main())
+        #Loop invariants bound once
+        field = Field.main()
+        zero = field.zero()
+        one = field.one()
+        self.start = node_element(int(execution["start"]))
+        self.end = node_element(int(execution["end"]))
         #Remove nonce
         transitions = execution["path"]
+        #Each distinct node is hashed once, steps only look up the digest
+        node_ids = [int(t["dest"]) for t in transitions]
+        node_hashes = self.hash_nodes(node_ids + [800] if false_path else node_ids)
+        all_nodes = [node_element(node) for node in node_ids]
         stack = []
         for i in range(len(transitions)-1):
             nonce = nonce
-            curr_node = FieldElement(int(transitions[i]["dest"]), Field.main())
-            next_node = FieldElement(int(transitions[i+1]["dest"]), Field.main())
-            hash_transition = self.hash_trans([curr_node, next_node])
+            curr_node = all_nodes[i]
+            next_node = all_nodes[i+1]
 
 
-            valid = Field.main().one()
-            end = Field.main().zero()
-            call = Field.main().zero()
-            ret = Field.main().zero()
-            hash_src = self.rp.hash(curr_node)
-            hash_dest = self.rp.hash(next_node)
+            valid = one
+            end = zero
+            call = zero
+            ret = zero
+            hash_src = node_hashes[node_ids[i]]
+            hash_dest = node_hashes[node_ids[i+1]]
+            #Same digest as hash_trans([curr_node, next_node])
+            hash_transition = hash_src + hash_dest
+            #Top of the shadow stack is stack[-1]
             if len(stack) == 0:
-                call_stack_v = Field.main().zero()
+                call_stack_v = zero
             else:
-                call_stack_v = stack[0]
+                call_stack_v = stack[-1]
 
             if transitions[i]["type"] == "call":
-                stack = [ FieldElement(int(transitions[i]["return"]), Field.main())] + stack
-                call_stack_v = stack[0]
-                call = Field.main().one()
+                stack.append(node_element(int(transitions[i]["return"])))
+                call_stack_v = stack[-1]
+                call = one
             elif transitions[i]["type"] == "ret":
                 if len(stack) == 0:
-                    ret = Field.main().one()
-                elif stack[0] == curr_node:
-                    stack = stack[1:]
+                    ret = one
+                elif stack[-1] == curr_node:
+                    stack.pop()
                     if len(stack) == 0:
-                        call_stack_v = Field.main().zero()
+                        call_stack_v = zero
                     else:
-                        call_stack_v = stack[0]
-                    ret = Field.main().one()
+                        call_stack_v = stack[-1]
+                    ret = one
 
             state += [[nonce, curr_node, next_node, hash_transition, call_stack_v, valid, end, hash_src, hash_dest, call, ret]]
         if false_path:
             random_len = random.randint(0, 10)
             for i in range(random_len):
-                nonce = Field.main().zero()
-                curr_node = FieldElement(800, Field.main())
-                next_node = FieldElement(800, Field.main())
-                hash_transition = self.hash_trans([curr_node, next_node])
-                valid = Field.main().zero()
-                end = Field.main().zero()
-                call = Field.main().zero()
-                ret = Field.main().zero()
-                hash_src = self.rp.hash(curr_node)
-                hash_dest = self.rp.hash(next_node)
+                nonce = zero
+                curr_node = node_element(800)
+                next_node = node_element(800)
+                valid = zero
+                end = zero
+                call = zero
+                ret = zero
+                hash_src = node_hashes[800]
+                hash_dest = node_hashes[800]
+                hash_transition = hash_src + hash_dest
                 if len(stack) == 0:
-                    call_stack_v = Field.main().zero()
+                    call_stack_v = zero
                 else:
-                    call_stack_v = stack[0]
+                    call_stack_v = stack[-1]
                 state += [[nonce, curr_node, next_node, hash_transition, call_stack_v, valid, end, hash_src, hash_dest, call, ret]]
 
-        state += [[nonce, FieldElement(int(transitions[-1]["dest"]), Field.main()),Field.main().zero(), Field.main().zero(),Field.main().zero(), Field.main().zero(),Field.main().zero(), Field.main().one(), Field.main().zero(), Field.main().zero(), Field.main().zero()]]
+        state += [[nonce, node_element(int(transitions[-1]["dest"])), zero, zero, zero, zero, zero, one, zero, zero, zero]]
         self.cycle_num = len(state)
         return  state
 
     def polynomial_digest(self):
         field = Field.main()
         X = Polynomial([field.zero(), field.one()])
-        acc = Polynomial([field.one()])
-        for hash in self.hash_transitions:
-            acc *= (X-hash)
-        return acc
+        factors = [X-Polynomial([hash]) for hash in self.hash_transitions]
+        if len(factors) == 0:
+            return Polynomial([field.one()])
+        return tree_product(factors)
     def round_constants_polynomials( self, omicron ):
         first_step_constants = []
         for i in range(2):
             N = 64
-            domain = [omicron^r for r in range(0, N)]
             values = [self.round_constants[2*r*2+i] for r in range(0, N)]
-            univariate = Polynomial.interpolate_domain(domain, values)
+            #omicron must generate the order-N subgroup
+            univariate = Polynomial.interpolate_subgroup(omicron, values)
             multivariate = MPolynomial.lift(univariate, 0)
             first_step_constants += [multivariate]
         second_step_constants = []
         for i in range(self.m):
-            domain = [omicron^r for r in range(0, self.N)]
             values = [self.field.zero()] * self.N
             #for r in range(self.N):
             #    print("len(round_constants):", len(self.round_constants), " but grabbing index:", 2*r*self.m+self.m+i, "for r=", r, "for m=", self.m, "for i=", i)
             #    values[r] = self.round_constants[2*r*self.m + self.m + i]
             values = [self.round_constants[2*r*self.m+self.m+i] for r in range(self.N)]
-            univariate = Polynomial.interpolate_domain(domain, values)
+            univariate = Polynomial.interpolate_subgroup(omicron, values)
             multivariate = MPolynomial.lift(univariate, 0)
             second_step_constants += [multivariate]
 
@@ -1,4 +1,7 @@
 
+from array import array
+from collections.abc import Mapping
+from functools import lru_cache
 from hashlib import blake2b
 
 from algebra import FieldElement, Field
@@ -39,16 +42,75 @@ from algebra import FieldElement, Field
 
 
 
+MAIN_FIELD = Field.main()
+
+#CFG in compressed sparse row form. The neighbours of src are stored
+#contiguously in indices[indptr[src]:indptr[src+1]], rows are indexed by
+#node id. It reads like the {src: [dests]} dict it is built from, so code
+#that walks a dict CFG works on it unchanged
+class CFG(Mapping):
+    def __init__(self, nodes, indptr, indices):
+        #Source nodes in the order they were added
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.present = bytearray(len(indptr) - 1)
+        for node in nodes:
+            self.present[node] = 1
+
+    def from_dict(adjlist):
+        size = max(adjlist, default=-1) + 1
+        #Count the degree of every node, then prefix sum into row offsets
+        indptr = array('q', [0]) * (size + 1)
+        for src in adjlist:
+            indptr[src+1] = len(adjlist[src])
+        for i in range(size):
+            indptr[i+1] += indptr[i]
+        indices = array('q', [0]) * indptr[size]
+        for src in adjlist:
+            indices[indptr[src]:indptr[src+1]] = array('q', adjlist[src])
+        return CFG(array('q', adjlist), indptr, indices)
+
+    #Neighbours of src as a slice of the indices array
+    def neighbors(self, src):
+        return self.indices[self.indptr[src]:self.indptr[src+1]]
+
+    def __getitem__(self, src):
+        if src not in self:
+            raise KeyError(src)
+        return self.neighbors(src).tolist()
+
+    def __contains__(self, src):
+        return 0 <= src < len(self.present) and self.present[src] == 1
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+#Field element of a node id in the main field. Node ids are few and repeat
+#across an execution, so each one is only built once and then shared
+@lru_cache(maxsize=None)
+def node_element(node):
+    return FieldElement(node, MAIN_FIELD)
+
+#Hash of a single node id: blake2b over the raw little-endian bytes of the id,
+#read back as an integer in the field
+def hash_node(node, p):
+    digest = blake2b(node.to_bytes(8, "little"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % p
+
 #This functions gets the adjlist hashed
 def get_adjlist_hash(cfg):
+    p = Field.main().p
+    #Hash every node once, no matter how many edges it appears in
+    node_hashes = {}
+    for src in cfg:
+        for node in [src] + cfg[src]:
+            if node not in node_hashes:
+                node_hashes[node] = hash_node(node, p)
     hash_cfg = {}
     for src in cfg:
-        src_hash_bytes = blake2b(str(src).encode("UTF-8")).hexdigest()
-        src_hash = FieldElement(int.from_bytes(bytes(src_hash_bytes, "UTF-8")), Field.main())
-        dests = cfg[src]
-        hash_cfg[src_hash.value] = []
-        for dest in dests:
-            dest_bytes = blake2b(str(dest).encode("UTF-8")).hexdigest()
-            dest_hash = FieldElement(int.from_bytes(bytes(dest_bytes, "UTF-8")), Field.main())
-            hash_cfg[src_hash.value].append(dest_hash.value)
+        hash_cfg[node_hashes[src]] = [node_hashes[dest] for dest in cfg[src]]
     return hash_cfg
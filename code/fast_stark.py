@@ -29,7 +29,7 @@ class FastStark:
         self.generator = self.field.generator()
         self.omega = self.field.primitive_nth_root(self.fri_domain_length)
         self.omicron = self.field.primitive_nth_root(self.omicron_domain_length)
-        self.omicron_domain = [self.omicron^i for i in range(self.omicron_domain_length)]
+        self.omicron_domain = self.omicron.geometric_sequence(self.omicron_domain_length)
 
         self.fri = Fri(self.generator, self.omega, self.fri_domain_length, self.expansion_factor, self.num_colinearity_checks)
 
@@ -53,7 +53,7 @@ class FastStark:
     def boundary_zerofiers( self, boundary ):
         zerofiers = []
         for s in range(self.num_registers):
-            points = [self.omicron^c for c, r, v in boundary if r == s]
+            points = [self.omicron_domain[c] for c, r, v in boundary if r == s]
             zerofiers = zerofiers + [Polynomial.zerofier_domain(points)]
         return zerofiers
 
@@ -61,7 +61,7 @@ class FastStark:
         interpolants = []
         for s in range(self.num_registers):
             points = [(c,v) for c, r, v in boundary if r == s]
-            domain = [self.omicron^c for c,v in points]
+            domain = [self.omicron_domain[c] for c,v in points]
             values = [v for c,v in points]
             interpolants = interpolants + [Polynomial.interpolate_domain(domain, values)]
         return interpolants
@@ -85,7 +85,7 @@ class FastStark:
 
         # interpolate
         print("interpolate")
-        trace_domain = [self.omicron^i for i in range(len(trace))]
+        trace_domain = self.omicron_domain[:len(trace)]
         trace_polynomials = []
         for s in range(self.num_registers):
             single_trace = [trace[c][s] for c in range(len(trace))]
@@ -51,7 +51,7 @@ class Fri:
         return indices
 
     def eval_domain( self ):
-        return [self.offset * (self.omega^i) for i in range(self.domain_length)]
+        return self.omega.geometric_sequence(self.domain_length, self.offset)
 
     def commit( self, codeword, proof_stream, round_index=0 ):
         one = self.field.one()
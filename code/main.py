@@ -1,68 +1,54 @@
 
 import time
 import sys
-from Attestation import Attestation
+from array import array
+from Attestation import Attestation, Execution, TYPE_CODES, JMP, START
 from algebra import *
 from fast_stark import FastStark
 from ip import ProofStream
+from cfg import CFG, node_element
+#Type codes keyed by the raw bytes of the step kind
+BYTE_TYPE_CODES = {name.encode(): code for name, code in TYPE_CODES.items()}
 def load_trace_from_file(path):
-    execution_path = {}
-    with open(path, 'r') as file:
-        lines = file.readlines()
-        # Create a list to store the content
-        # Iterate through each line
-        start = True
-        for line in lines:
-            # Remove the newline character and split by comma
-            parts = line.strip().split(' ')
-            if start:
-                start = False
-                split_list= parts[0].strip().split('=')
-                execution_path["start"] = FieldElement(int(split_list[1]), Field.main())
-                split_list= parts[1].strip().split('=')
-                execution_path["end"] = FieldElement(int(split_list[1]), Field.main())
-                start_node = {}
-                start_node["type"] = "start"
-                start_node["dest"] = execution_path["start"]
-                start_node["return"] = execution_path["start"]
-                execution_path["path"] = [start_node]
-                continue
-            # select the second element
-            if "call" in parts:
-                jmp = {}
-                jmp["type"] = "call"
-                jmp["dest"] = FieldElement(int(parts[1]), Field.main())
-                jmp["return"] = FieldElement(int(parts[2]), Field.main())
-                execution_path["path"].append(jmp)
-            elif "ret" in parts:
-                jmp = {}
-                jmp["type"] = "ret"
-                jmp["dest"] = FieldElement(int(parts[1]), Field.main())
-                jmp["return"] = FieldElement(int(parts[1]), Field.main())
-                execution_path["path"].append(jmp)
-
-            else:
-                jmp = {}
-                jmp["type"] = "jmp"
-                jmp["dest"] = FieldElement(int(parts[1]), Field.main())
-                jmp["return"] = FieldElement(int(parts[1]), Field.main())
-                execution_path["path"].append(jmp)
-            # Append the second element to the content list
-    return execution_path
+    types = array('b')
+    dests = array('q')
+    returns = array('q')
+    # Stream the file line by line, it is never held in memory as a whole.
+    # The file is read as bytes: the ids are ASCII and int() parses bytes
+    # directly, so no line is ever decoded
+    with open(path, 'rb') as file:
+        # The header holds the start and end nodes
+        parts = next(file).strip().split(b' ')
+        start_node = int(parts[0].strip().split(b'=')[1])
+        end_node = int(parts[1].strip().split(b'=')[1])
+        types.append(START)
+        dests.append(start_node)
+        returns.append(start_node)
+        # Bind the lookups once, the loop body runs once per step
+        type_code = BYTE_TYPE_CODES.get
+        add_type, add_dest, add_return = types.append, dests.append, returns.append
+        for line in file:
+            # One step per line: "<type> <dest>" or "call <dest> <return>"
+            # int() ignores the trailing newline of the last token
+            parts = line.split(b' ')
+            kind = parts[0]
+            dest = int(parts[1])
+            add_type(type_code(kind, JMP))
+            add_dest(dest)
+            add_return(int(parts[2]) if kind == b"call" else dest)
+    return Execution(node_element(start_node), node_element(end_node), types, dests, returns)
 def load_cfg(path):
     cfg = {}
-    with open(path, 'r') as file:
-        lines = file.readlines()
-        # Create a list to store the content
-        # Iterate through each line
-        for line in lines:
-            # Remove the newline character and split by comma
-            parts = line.strip().split(' ')
+    with open(path, 'rb') as file:
+        # Iterate through each line, streaming raw bytes from the file
+        for line in file:
+            # Split on whitespace, this also drops the newline character
+            parts = line.split()
             # select the first element
             src = int(parts[0])
             dests = [int(dest) for dest in parts[1:]]
             cfg[src] = dests
-        return cfg
+        return CFG.from_dict(cfg)
 if __name__ == '__main__':
     cfg_path = sys.argv[1]
     path = sys.argv[2]
@@ -73,15 +59,16 @@ if __name__ == '__main__':
     time_pre = time.time()
 
     a = Attestation(cfg)
-    one_h = FieldElement(1254, Field.main())
+    field = Field.main()
+    one_h = FieldElement(1254, field)
     print("Loading execution trace from: ", path)
     execution = load_trace_from_file(path)
     print("Tracing...")
-    state = a.trace(one_h, execution["start"], execution["end"], execution["path"])
+    state = a.trace(one_h, execution.start, execution.end, execution)
     print("Generating boundary constraints...")
     boundary = a.boundary_constraints(one_h,a.start,a.end)
     print("Setting up STARK...")
-    stark = FastStark(Field.main(), 8, 43, 128, a.num_registers, a.num_cycles, transition_constraints_degree=a.max_adjacency+1)
+    stark = FastStark(field, 8, 43, 128, a.num_registers, a.num_cycles, transition_constraints_degree=a.max_adjacency+1)
     print("Generating AIR...")
     air  = a.transition_constraints(stark.omicron)
     print("Preprocessing...")
@@ -1,67 +1,38 @@
 import time
+import hashlib
+import pickle
+from pathlib import Path
 
 from Attestation import Attestation
 from algebra import *
 from fast_stark import FastStark
 from ip import ProofStream
-def load_trace_from_file(path):
-    execution_path = {}
-    with open(path, 'r') as file:
-        lines = file.readlines()
-        # Create a list to store the content
-        # Iterate through each line
-        start = True
-        for line in lines:
-            # Remove the newline character and split by comma
-            parts = line.strip().split(' ')
-            if start:
-                start = False
-                split_list= parts[0].strip().split('=')
-                execution_path["start"] = FieldElement(int(split_list[1]), Field.main())
-                split_list= parts[1].strip().split('=')
-                execution_path["end"] = FieldElement(int(split_list[1]), Field.main())
-                start_node = {}
-                start_node["type"] = "start"
-                start_node["dest"] = execution_path["start"]
-                start_node["return"] = execution_path["start"]
-                execution_path["path"] = [start_node]
-                continue
-            # select the second element
-            if "call" in parts:
-                jmp = {}
-                jmp["type"] = "call"
-                jmp["dest"] = FieldElement(int(parts[1]), Field.main())
-                jmp["return"] = FieldElement(int(parts[2]), Field.main())
-                execution_path["path"].append(jmp)
-            elif "ret" in parts:
-                jmp = {}
-                jmp["type"] = "ret"
-                jmp["dest"] = FieldElement(int(parts[1]), Field.main())
-                jmp["return"] = FieldElement(int(parts[1]), Field.main())
-                execution_path["path"].append(jmp)
+from main import load_trace_from_file, load_cfg
+
+#Preprocessed transition zerofiers, kept on disk across runs
+PREPROCESS_CACHE = Path.home() / ".cache" / "starkra"
+#Bump when the pickled layout of stark.preprocess() changes
+PREPROCESS_CACHE_VERSION = 1
+
+#stark.preprocess() only depends on the field and the domain sizes, not on
+#the trace, so its result is computed once per shape and reloaded afterwards
+def cached_preprocess(stark):
+    key = (PREPROCESS_CACHE_VERSION, stark.field.p, stark.original_trace_length, stark.omicron_domain_length, stark.fri_domain_length)
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()[:16]
+    cache_path = PREPROCESS_CACHE / ("preprocess_" + digest + ".pkl")
+    if cache_path.exists():
+        try:
+            with open(cache_path, "rb") as file:
+                return pickle.load(file)
+        except Exception:
+            #Truncated or stale cache file, rebuild it below
+            pass
+    preprocessed = stark.preprocess()
+    PREPROCESS_CACHE.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "wb") as file:
+        pickle.dump(preprocessed, file)
+    return preprocessed
 
-            else:
-                jmp = {}
-                jmp["type"] = "jmp"
-                jmp["dest"] = FieldElement(int(parts[1]), Field.main())
-                jmp["return"] = FieldElement(int(parts[1]), Field.main())
-                execution_path["path"].append(jmp)
-            # Append the second element to the content list
-    return execution_path
-def load_cfg(path):
-    cfg = {}
-    with open(path, 'r') as file:
-        lines = file.readlines()
-        # Create a list to store the content
-        # Iterate through each line
-        for line in lines:
-            # Remove the newline character and split by comma
-            parts = line.strip().split(' ')
-            # select the first element
-            src = int(parts[0])
-            dests = [int(dest) for dest in parts[1:]]
-            cfg[src] = dests
-        return cfg
 if __name__ == '__main__':
 
     cfg = load_cfg("/Users/jglez2330/Library/Mobile Documents/com~apple~CloudDocs/personal/STARK-ntt-attesttation/code/complete_runs/aha-mont64/numified_adjlist")
@@ -91,15 +62,16 @@ if __name__ == '__main__':
    # path = "/Users/jglez2330/Library/Mobile Documents/com~apple~CloudDocs/personal/STARK-ntt-attesttation/code/example_trace.txt"
 
     a = Attestation(cfg)
-    one_h = FieldElement(100, Field.main())
+    field = Field.main()
+    one_h = FieldElement(100, field)
     execution = load_trace_from_file(path)
     start = time.time()
-    state = a.trace(one_h, execution["start"], execution["end"], execution["path"])
+    state = a.trace(one_h, execution.start, execution.end, execution)
     boundary = a.boundary_constraints(one_h,a.start,a.end)
 
-    stark = FastStark(Field.main(), 16, 32, 128, a.num_registers, a.num_cycles, transition_constraints_degree=a.max_adjacency+1)
+    stark = FastStark(field, 16, 32, 128, a.num_registers, a.num_cycles, transition_constraints_degree=a.max_adjacency+1)
     air  = a.transition_constraints(stark.omicron)
-    transition_zerofier, transition_zerofier_codeword, transition_zerofier_root = stark.preprocess()
+    transition_zerofier, transition_zerofier_codeword, transition_zerofier_root = cached_preprocess(stark)
     end = time.time()
     print("Execution time setup: ", end - start)
     start = time.time()
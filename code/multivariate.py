@@ -49,6 +49,25 @@ class MPolynomial:
                     dictionary[exponent] = v0 * v1
         return MPolynomial(dictionary)
 
+    # Product with a factor of only a few terms, e.g. the difference of two
+    # variables. Loops over the factor's terms on the outside, adds exponents
+    # with zip, and drops terms that cancel to zero.
+    def mul_sparse_linear( self, factor ):
+        dictionary = dict()
+        num_variables = max([len(k) for k in self.dictionary.keys()] + [len(k) for k in factor.dictionary.keys()])
+        padded = [(tuple(k) + (0,) * (num_variables - len(k)), v) for k, v in self.dictionary.items()]
+        for k1, v1 in factor.dictionary.items():
+            if v1.is_zero():
+                continue
+            k1 = tuple(k1) + (0,) * (num_variables - len(k1))
+            for k0, v0 in padded:
+                exponent = tuple(a + b for a, b in zip(k0, k1))
+                if exponent in dictionary:
+                    dictionary[exponent] = dictionary[exponent] + v0 * v1
+                else:
+                    dictionary[exponent] = v0 * v1
+        return MPolynomial({k: v for k, v in dictionary.items() if not v.is_zero()})
+
     def __sub__( self, other ):
         return self + (-other)
 
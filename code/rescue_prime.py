@@ -159,6 +159,33 @@ class RescuePrime:
         # squeeze
         return state[0]
 
+    def hash_batch( self, input_elements ):
+        # same permutation as hash, but on raw integers: the MDS matrix and
+        # round constants are unpacked once and shared by the whole batch
+        p = self.p
+        m = self.m
+        mds = [[v.value for v in row] for row in self.MDS]
+        constants = [c.value for c in self.round_constants]
+        outputs = []
+        for input_element in input_elements:
+            # absorb
+            state = [input_element.value] + [0] * (m - 1)
+
+            # permutation
+            for r in range(self.N):
+
+                # forward half-round
+                state = [pow(s, self.alpha, p) for s in state]
+                state = [(sum(mds[i][j] * state[j] for j in range(m)) + constants[2*r*m+i]) % p for i in range(m)]
+
+                # backward half-round
+                state = [pow(s, self.alphainv, p) for s in state]
+                state = [(sum(mds[i][j] * state[j] for j in range(m)) + constants[2*r*m+m+i]) % p for i in range(m)]
+
+            # squeeze
+            outputs += [FieldElement(state[0], self.field)]
+        return outputs
+
     def forward_poly(self, poly):
         state = [poly] + [MPolynomial.constant(self.field.zero())] * (self.m - 1)
         for r in range(self.N):
@@ -231,16 +258,15 @@ class RescuePrime:
         return constraints
 
     def round_constants_polynomials( self, omicron ):
+        domain = omicron.geometric_sequence(self.N)
         first_step_constants = []
         for i in range(self.m):
-            domain = [omicron^r for r in range(0, self.N)]
             values = [self.round_constants[2*r*self.m+i] for r in range(0, self.N)]
             univariate = Polynomial.interpolate_domain(domain, values)
             multivariate = MPolynomial.lift(univariate, 0)
             first_step_constants += [multivariate]
         second_step_constants = []
         for i in range(self.m):
-            domain = [omicron^r for r in range(0, self.N)]
             values = [self.field.zero()] * self.N
             #for r in range(self.N):
             #    print("len(round_constants):", len(self.round_constants), " but grabbing index:", 2*r*self.m+self.m+i, "for r=", r, "for m=", self.m, "for i=", i)
@@ -28,7 +28,7 @@ class Stark:
         self.generator = self.field.generator()
         self.omega = self.field.primitive_nth_root(fri_domain_length)
         self.omicron = self.field.primitive_nth_root(omicron_domain_length)
-        self.omicron_domain = [self.omicron^i for i in range(omicron_domain_length)]
+        self.omicron_domain = self.omicron.geometric_sequence(omicron_domain_length)
 
         self.fri = Fri(self.generator, self.omega, fri_domain_length, self.expansion_factor, self.num_colinearity_checks)
 
@@ -50,7 +50,7 @@ class Stark:
     def boundary_zerofiers( self, boundary ):
         zerofiers = []
         for s in range(self.num_registers):
-            points = [self.omicron^c for c, r, v in boundary if r == s]
+            points = [self.omicron_domain[c] for c, r, v in boundary if r == s]
             zerofiers = zerofiers + [Polynomial.zerofier_domain(points)]
         return zerofiers
 
@@ -58,7 +58,7 @@ class Stark:
         interpolants = []
         for s in range(self.num_registers):
             points = [(c,v) for c, r, v in boundary if r == s]
-            domain = [self.omicron^c for c,v in points]
+            domain = [self.omicron_domain[c] for c,v in points]
             values = [v for c,v in points]
             interpolants = interpolants + [Polynomial.interpolate_domain(domain, values)]
         return interpolants
@@ -80,7 +80,7 @@ class Stark:
             trace = trace + [[self.field.sample(os.urandom(17)) for s in range(self.num_registers)]]
 
         # interpolate
-        trace_domain = [self.omicron^i for i in range(len(trace))]
+        trace_domain = self.omicron_domain[:len(trace)]
         trace_polynomials = []
         for s in range(self.num_registers):
             single_trace = [trace[c][s] for c in range(len(trace))]
@@ -0,0 +1,32 @@
+from algebra import *
+import os
+
+def test_batch_inverse( ):
+    field = Field.main()
+
+    elements = [field.sample(os.urandom(17)) for i in range(20)]
+    elements = [e for e in elements if not e.is_zero()]
+
+    inverses = field.batch_inverse(elements)
+
+    assert(len(inverses) == len(elements)), "batch inverse returned wrong number of elements"
+    for e, inv in zip(elements, inverses):
+        assert(inv == e.inverse()), "batch inverse disagrees with inverse"
+        assert(e * inv == field.one()), "batch inverse is not an inverse"
+    assert(field.batch_inverse([]) == []), "batch inverse of empty list is not empty"
+
+    print("field batch inverse test success \\o/")
+
+def test_geometric_sequence( ):
+    field = Field.main()
+    base = field.sample(os.urandom(17))
+    first = field.sample(os.urandom(17))
+
+    sequence = base.geometric_sequence(10)
+    assert(sequence == [base^i for i in range(10)]), "geometric sequence disagrees with powers"
+
+    shifted = base.geometric_sequence(10, first)
+    assert(shifted == [first * (base^i) for i in range(10)]), "shifted geometric sequence disagrees with powers"
+    assert(base.geometric_sequence(0) == []), "empty geometric sequence is not empty"
+
+    print("geometric sequence test success \\o/")
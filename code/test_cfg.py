@@ -0,0 +1,25 @@
+from cfg import *
+
+def test_csr_cfg( ):
+    adjlist = {0: [1, 2], 1: [3], 2: [4], 3: [5], 5: [], 4: []}
+    cfg = CFG.from_dict(adjlist)
+
+    assert(list(cfg) == list(adjlist)), "csr cfg does not keep the source order"
+    assert(len(cfg) == len(adjlist)), "csr cfg has the wrong number of nodes"
+    for src in adjlist:
+        assert(src in cfg), "csr cfg lost a node"
+        assert(cfg[src] == adjlist[src]), "csr cfg row disagrees with the adjacency list"
+        assert(list(cfg.neighbors(src)) == adjlist[src]), "csr cfg neighbors disagree with the adjacency list"
+    assert(dict(cfg) == adjlist), "csr cfg does not read like its adjacency list"
+
+    # missing nodes have no row
+    sparse = CFG.from_dict({0: [3], 3: [0, 3]})
+    assert(1 not in sparse and 7 not in sparse), "csr cfg invented a node"
+    try:
+        sparse[1]
+        assert(False), "csr cfg returned a row for a missing node"
+    except KeyError:
+        pass
+    assert(list(sparse.neighbors(3)) == [0, 3]), "csr cfg neighbors of a sparse node are wrong"
+
+    print("csr cfg test success \\o/")
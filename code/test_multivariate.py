@@ -25,6 +25,24 @@ def test_evaluate( ):
     print("eval3:", eval3.value)
     print("multivariate evaluate test success \\o/")
 
+def test_mul_sparse_linear( ):
+    field = Field.main()
+    variables = MPolynomial.variables(4, field)
+    one = field.one()
+    two = FieldElement(2, field)
+    five = FieldElement(5, field)
+
+    acc = MPolynomial.constant(one)
+    for neighbour in variables[1:]:
+        acc = acc.mul_sparse_linear(neighbour - variables[0])
+    expected = (variables[1] - variables[0]) * (variables[2] - variables[0]) * (variables[3] - variables[0])
+
+    point = [two, five, one, FieldElement(7, field)]
+    assert(acc.evaluate(point) == expected.evaluate(point)), "sparse linear multiplication does not match dense multiplication"
+    assert(all(not v.is_zero() for v in acc.dictionary.values())), "sparse linear multiplication kept a zero term"
+
+    print("multivariate sparse linear multiplication test success \\o/")
+
 def test_lift( ):
     field = Field.main()
     variables = MPolynomial.variables(4, field)
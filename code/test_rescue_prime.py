@@ -17,6 +17,17 @@ def test_rescue_prime( ):
 
     print("Rescue-Prime eval tests pass \\o/")
 
+def test_hash_batch( ):
+    rp = RescuePrime()
+
+    inputs = [FieldElement(v, rp.field) for v in [0, 1, 7, 57322816861100832358702415967512842988]]
+    outputs = rp.hash_batch(inputs)
+    assert(len(outputs) == len(inputs)), "hash_batch returned wrong number of outputs"
+    for i in range(len(inputs)):
+        assert(outputs[i] == rp.hash(inputs[i])), "hash_batch disagrees with hash"
+
+    print("Rescue-Prime batch hash tests pass \\o/")
+
 def test_trace( ):
     rp = RescuePrime()
 
@@ -70,6 +70,22 @@ def test_interpolate():
 
     print("univariate polynomial interpolate success \\o/")
 
+def test_interpolate_subgroup():
+    field = Field.main()
+
+    for n in [1, 2, 8, 32]:
+        omicron = field.primitive_nth_root(n)
+        domain = [omicron^i for i in range(n)]
+        values = [field.sample(os.urandom(17)) for i in range(n)]
+
+        poly = Polynomial.interpolate_subgroup(omicron, values)
+
+        assert(poly == Polynomial.interpolate_domain(domain, values)), "subgroup interpolation disagrees with Lagrange interpolation"
+        for i in range(n):
+            assert(poly.evaluate(domain[i]) == values[i]), "subgroup interpolant does not hit the values"
+
+    print("univariate polynomial subgroup interpolate success \\o/")
+
 def test_zerofier( ):
     field = Field.main()
 
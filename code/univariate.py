@@ -109,16 +109,69 @@ class Polynomial:
         assert(len(domain) > 0), "cannot interpolate between zero points"
         field = domain[0].field
         x = Polynomial([field.zero(), field.one()])
+        # invert all Lagrange denominators prod_{j != i} (d_i - d_j) in one batch
+        denominators = []
+        for i in range(len(domain)):
+            denominator = field.one()
+            for j in range(len(domain)):
+                if j == i:
+                    continue
+                denominator = denominator * (domain[i] - domain[j])
+            denominators += [denominator]
+        inverses = field.batch_inverse(denominators)
         acc = Polynomial([])
         for i in range(len(domain)):
-            prod = Polynomial([values[i]])
+            prod = Polynomial([values[i] * inverses[i]])
             for j in range(len(domain)):
                 if j == i:
                     continue
-                prod = prod * (x - Polynomial([domain[j]])) * Polynomial([(domain[i] - domain[j]).inverse()])
+                prod = prod * (x - Polynomial([domain[j]]))
             acc = acc + prod
         return acc
 
+    # interpolate over the subgroup {omicron^i} generated by a primitive nth
+    # root of unity, where n = len(values) is a power of two: an in-place
+    # inverse NTT on the raw integers, O(n log n) instead of O(n^2) Lagrange
+    def interpolate_subgroup( omicron, values ):
+        n = len(values)
+        assert(n > 0), "cannot interpolate between zero points"
+        assert(n & (n - 1) == 0), "cannot interpolate over subgroup of non-power-of-two order"
+        field = omicron.field
+        assert(omicron^n == field.one()), "omicron must be nth root of unity, where n is len(values)"
+        assert(n == 1 or omicron^(n//2) != field.one()), "omicron is not primitive nth root of unity, where n is len(values)"
+        p = field.p
+        coefficients = [v.value for v in values]
+
+        # bit-reversal permutation
+        j = 0
+        for i in range(1, n):
+            bit = n >> 1
+            while j & bit:
+                j ^= bit
+                bit >>= 1
+            j |= bit
+            if i < j:
+                coefficients[i], coefficients[j] = coefficients[j], coefficients[i]
+
+        # butterflies with the inverse root
+        root = omicron.inverse().value
+        length = 2
+        while length <= n:
+            half = length // 2
+            step = pow(root, n // length, p)
+            for start in range(0, n, length):
+                w = 1
+                for k in range(start, start + half):
+                    u = coefficients[k]
+                    v = coefficients[k + half] * w % p
+                    coefficients[k] = (u + v) % p
+                    coefficients[k + half] = (u - v) % p
+                    w = w * step % p
+            length *= 2
+
+        ninv = FieldElement(n, field).inverse().value
+        return Polynomial([FieldElement(c * ninv % p, field) for c in coefficients])
+
     def zerofier_domain( domain ):
         field = domain[0].field
         x = Polynomial([field.zero(), field.one()])
@@ -4,25 +4,26 @@ import subprocess
 import time
 import csv
 import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # -------------------------- Parsing -----------------------------
 
-def parse_time_ms(label: str, text: str):
+# Everything parse_output needs, matched in a single scan of the output:
+# the Prove/Verify times (label, value, unit) and the proof size in bytes
+OUTPUT_RE = re.compile(
+    r"(Prove|Verify):\s*([0-9.]+)\s*([uµμ]?s|ms|s)"
+    r"|Proof:\s*.*\((\d+)\s*bytes\)"
+)
+
+
+def time_to_ms(value: str, unit: str):
     """
-    Parse a time like:
-      'Prove: 2.283ms'
-      'Verify: 169.891µs'
-      'Prove: 0.5s'
-    and return milliseconds (float) or None.
+    Convert a time like ('2.283', 'ms'), ('169.891', 'µs') or ('0.5', 's')
+    to milliseconds (float), or None for an unknown unit.
     """
-    pattern = rf"{label}:\s*([0-9.]+)\s*([uµμ]?s|ms|s)"
-    m = re.search(pattern, text)
-    if not m:
-        return None
-
-    value = float(m.group(1))
-    unit = m.group(2)
+    value = float(value)
 
     if unit in ("us", "µs", "μs"):
         return value / 1000.0      # µs → ms
@@ -34,21 +35,24 @@ def parse_time_ms(label: str, text: str):
         return None
 
 
-PROOF_RE = re.compile(r"Proof:\s*.*\((\d+)\s*bytes\)")
-
-
 def parse_output(stdout: str):
     """
     Extract prove_ms, verify_ms, proof_bits from the command stdout.
-    All times in ms, proof size in bits.
+    All times in ms, proof size in bits. The first occurrence of each
+    line wins; missing values are None.
     """
-    prove_ms = parse_time_ms("Prove", stdout)
-    verify_ms = parse_time_ms("Verify", stdout)
-
+    times = {}
     proof_bytes = None
-    m = PROOF_RE.search(stdout)
-    if m:
-        proof_bytes = int(m.group(1))
+    for m in OUTPUT_RE.finditer(stdout):
+        label = m.group(1)
+        if label is None:
+            if proof_bytes is None:
+                proof_bytes = int(m.group(4))
+        elif label not in times:
+            times[label] = time_to_ms(m.group(2), m.group(3))
+
+    prove_ms = times.get("Prove")
+    verify_ms = times.get("Verify")
     proof_bits = proof_bytes * 8 if proof_bytes is not None else None
 
     return prove_ms, verify_ms, proof_bits
@@ -56,13 +60,14 @@ def parse_output(stdout: str):
 
 # -------------------------- CFG Generation -----------------------------
 
-def build_cfg_with_neighbors(n_nodes: int, neighbor_count: int):
+def write_numified_files(n_nodes: int, neighbor_count: int, outdir: Path):
     """
-    Build a CFG where each node has exactly 'neighbor_count' outgoing edges.
-    The actual neighbor *values* don't matter (they can all be 0); only the
-    number of neighbors per node is important.
+    Write into 'outdir':
+      - numified_adjlist : edge list with 'neighbor_count' outgoing edges per node
+      - numified_path    : linear path 0 -> 1 -> ... -> n-1 (same as before)
 
-    So for n_nodes = 5, neighbor_count = 4, one possible adjacency is:
+    Only the number of neighbors per node matters, not their *values*, so
+    every edge points to node 0. For n_nodes = 5, neighbor_count = 4:
 
       0 -> 0,0,0,0
       1 -> 0,0,0,0
@@ -70,49 +75,75 @@ def build_cfg_with_neighbors(n_nodes: int, neighbor_count: int):
       3 -> 0,0,0,0
       4 -> 0,0,0,0
 
-    We encode this as an *edge list* (one "src dst" per line).
+    Both files are formatted straight to bytes and written with a single
+    call, with no text encoding pass.
     """
-    adj = {i: [] for i in range(n_nodes)}
-
-    for i in range(n_nodes):
-        for _ in range(neighbor_count):
-            adj[i].append(0)  # always 0; we only care about count
-
-    return adj
-
-
-def write_numified_files(n_nodes: int, neighbor_count: int):
-    """
-    Write:
-      - numified_adjlist : edge list with 'neighbor_count' outgoing edges per node
-      - numified_path    : linear path 0 -> 1 -> ... -> n-1 (same as before)
-    """
-    adjlist = build_cfg_with_neighbors(n_nodes, neighbor_count)
-
     # Execution path: still a simple chain 0→1→...→n-1
-    with open("numified_path", "w") as f:
-        f.write(f"initial_node=0 final_node={n_nodes - 1}\n")
-        for edge_id in range(1, n_nodes):
-            f.write(f"jump {edge_id}\n")
+    path = [b"initial_node=0 final_node=%d\n" % (n_nodes - 1)]
+    path += [b"jump %d\n" % edge_id for edge_id in range(1, n_nodes)]
+    (outdir / "numified_path").write_bytes(b"".join(path))
 
     # Adjacency as edge list: one "src dst" per line
-    with open("numified_adjlist", "w") as f:
-        for src in range(n_nodes):
-            for dst in adjlist[src]:
-                f.write(f"{src} {dst}\n")
+    adjlist = [b"%d 0\n" % src * neighbor_count for src in range(n_nodes)]
+    (outdir / "numified_adjlist").write_bytes(b"".join(adjlist))
 
 
 # -------------------------- Execution -----------------------------
 
-def run_starkra(executable: str):
-    start = time.perf_counter()
-    proc = subprocess.run(
-        [executable, "numified_adjlist", "numified_path"],
-        text=True,
-        capture_output=True
-    )
-    elapsed = time.perf_counter() - start
-    return elapsed, proc.returncode, proc.stdout, proc.stderr
+def run_starkra(executable: str, workdir: Path, log_path: Path):
+    """
+    Run starkra with its stdout going straight into 'log_path', so the
+    output never passes through this process.
+    """
+    # Build the argument tuple before the clock starts
+    args = (executable, str(workdir / "numified_adjlist"), str(workdir / "numified_path"))
+    with log_path.open("wb") as log:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            args,
+            stdout=log,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed, proc.returncode, proc.stderr
+
+
+def one_run(executable: str, k: int, neighbor_count: int, run_i: int):
+    """
+    Generate the inputs for one (k, neighbors, run) triple in a private
+    temporary directory, run starkra on them and return the CSV row.
+    The run's stdout is logged to logs/synth/k/neigh_<neighbor_count>/run_i.
+    """
+    n_nodes = 2 ** k
+    path_len = n_nodes - 1
+
+    logdir = Path(f"logs/synth/{k}/neigh_{neighbor_count}")
+    logdir.mkdir(parents=True, exist_ok=True)
+    log_path = logdir / f"run_{run_i}"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(tmpdir)
+        write_numified_files(n_nodes, neighbor_count, workdir)
+        elapsed, rc, stderr = run_starkra(executable, workdir, log_path)
+
+    # The log is only read back for the few timing lines
+    prove_ms, verify_ms, proof_bits = parse_output(log_path.read_text())
+    elapsed_ms = elapsed * 1000.0
+
+    row = [
+        k,
+        n_nodes,
+        path_len,
+        neighbor_count,
+        run_i,
+        elapsed_ms,
+        prove_ms,
+        verify_ms,
+        proof_bits,
+        rc,
+    ]
+    return row
 
 
 # -------------------------- MAIN -----------------------------
@@ -136,6 +167,10 @@ def main():
                         help="Path to starkra executable.")
     parser.add_argument("--csv", type=str, default="starkra_results.csv",
                         help="Output CSV file.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of runs executed in parallel. Concurrent runs "
+                             "share the machine, so timings are only comparable "
+                             "to other runs made with the same value.")
     parser.add_argument("--verbose", action="store_true",
                         help="Print per-run details.")
 
@@ -145,12 +180,15 @@ def main():
         raise ValueError("min_neighbors must be >= 1")
     if args.max_neighbors < args.min_neighbors:
         raise ValueError("max_neighbors must be >= min_neighbors")
+    if args.jobs <= 0:
+        raise ValueError("jobs must be >= 1")
 
     csv_path = Path(args.csv)
     new_csv = not csv_path.exists()
 
     # Open CSV and write header if new
-    with csv_path.open("a", newline="") as csvfile:
+    # Large write buffer so rows don't cost a syscall each between runs
+    with csv_path.open("a", newline="", buffering=1 << 20) as csvfile:
         writer = csv.writer(csvfile)
         if new_csv:
             writer.writerow([
@@ -166,57 +204,36 @@ def main():
                 "return_code",
             ])
 
-        for k in range(args.min_power, args.max_power + 1):
-            n_nodes = 2 ** k
-            path_len = n_nodes - 1
-
-            if args.verbose:
-                print(f"\n=== k={k}, n={n_nodes}, path_len={path_len} ===")
+        # Every (k, neighbors, run) triple is independent: each run writes
+        # its inputs into its own temporary directory and its own log
+        tasks = [
+            (k, neighbor_count, run_i)
+            for k in range(args.min_power, args.max_power + 1)
+            for neighbor_count in range(args.min_neighbors, args.max_neighbors + 1)
+            for run_i in range(1, args.reps + 1)
+        ]
+
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [
+                pool.submit(one_run, args.exec, k, neighbor_count, run_i)
+                for k, neighbor_count, run_i in tasks
+            ]
+
+            # Collect in submission order, so the CSV keeps the sweep order
+            for future in futures:
+                row = future.result()
+                k, n_nodes, path_len, neighbor_count, run_i, elapsed_ms, prove_ms, verify_ms, proof_bits, rc = row
+
+                # Write CSV row
+                writer.writerow(row)
 
-            # For each path length, sweep neighbors from min_neighbors to max_neighbors
-            for neighbor_count in range(args.min_neighbors, args.max_neighbors + 1):
                 if args.verbose:
-                    print(f"  → neighbors={neighbor_count}")
-
-                # Generate CFG + path
-                write_numified_files(n_nodes, neighbor_count)
-
-                # Logs: logs/synth/k/neigh_<neighbor_count>/run_i
-                logdir = Path(f"logs/synth/{k}/neigh_{neighbor_count}")
-                logdir.mkdir(parents=True, exist_ok=True)
-
-                for run_i in range(1, args.reps + 1):
-                    elapsed, rc, stdout, stderr = run_starkra(args.exec)
-
-                    prove_ms, verify_ms, proof_bits = parse_output(stdout)
-                    elapsed_ms = elapsed * 1000.0
-
-                    # Save stdout
-                    out_file = logdir / f"run_{run_i}"
-                    with out_file.open("w") as f:
-                        f.write(stdout)
-
-                    # Write CSV row
-                    writer.writerow([
-                        k,
-                        n_nodes,
-                        path_len,
-                        neighbor_count,
-                        run_i,
-                        elapsed_ms,
-                        prove_ms,
-                        verify_ms,
-                        proof_bits,
-                        rc,
-                    ])
-
-                    if args.verbose:
-                        print(
-                            f"    run={run_i}: wall={elapsed_ms:.3f} ms, "
-                            f"prove={prove_ms}, verify={verify_ms}, "
-                            f"proof_bits={proof_bits}, rc={rc}"
-                        )
-
+                    print(
+                        f"k={k}, n={n_nodes}, neighbors={neighbor_count}, "
+                        f"run={run_i}: wall={elapsed_ms:.3f} ms, "
+                        f"prove={prove_ms}, verify={verify_ms}, "
+                        f"proof_bits={proof_bits}, rc={rc}"
+                    )
 
 if __name__ == "__main__":
     main()
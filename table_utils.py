@@ -0,0 +1,41 @@
+import csv
+import numpy as np
+
+# -------- Helpers to parse time strings -------- #
+
+def parse_times(col):
+    """
+    Parses a whole column of strings like '10.023ms', '240.442µs'
+    Returns times in milliseconds (float array).
+    """
+    s = np.char.strip(np.char.replace(col, '"', ''))
+    is_us = np.char.endswith(s, "µs")
+    unparsed = ~(is_us | np.char.endswith(s, "ms"))
+    if unparsed.any():
+        raise ValueError(f"Unrecognized time format: {s[unparsed][0]}")
+
+    values = np.char.strip(np.char.rstrip(s, "µms")).astype(float)
+    # convert microseconds → milliseconds
+    return np.where(is_us, values / 1000.0, values)
+
+
+# -------- Load CSV -------- #
+
+def read_columns(path):
+    """
+    Reads a CSV file into {column name: array of strings}.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [row for row in reader if row]
+    return {name: np.array(column) for name, column in zip(header, zip(*rows))}
+
+
+def group_means(keys, *columns):
+    """
+    Mean of every column per distinct key, with the keys sorted.
+    """
+    groups, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse)
+    return groups, [np.bincount(inverse, weights=column) / counts for column in columns]
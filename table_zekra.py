@@ -1,42 +1,45 @@
-import pandas as pd
+import numpy as np
 
-# Load CSV
-df = pd.read_csv("zekra.csv")
+from table_utils import group_means, read_columns
+
+df = read_columns("zekra.csv")
 
 # Group by bench and compute means
-grouped = df.groupby("bench").agg({
-    "prover_time": "mean",
-    "verifier_time": "mean",
-    "proof_size_bits": "mean"
-})
+benches, (prover_time, verifier_time, proof_size_bits) = group_means(
+    df["bench"],
+    df["prover_time"].astype(float),
+    df["verifier_time"].astype(float),
+    df["proof_size_bits"].astype(float),
+)
 
 # Convert times to milliseconds
-grouped["prover_time_ms"] = grouped["prover_time"] * 1000
-grouped["verifier_time_ms"] = grouped["verifier_time"] * 1000
+prover_time_ms = prover_time * 1000
+verifier_time_ms = verifier_time * 1000
 
 # Format values
-grouped["prover_time_ms"] = grouped["prover_time_ms"].round(2)
-grouped["verifier_time_ms"] = grouped["verifier_time_ms"].round(4)
-grouped["proof_size_bits"] = grouped["proof_size_bits"].astype(int)
+prover_time_ms = prover_time_ms.round(2)
+verifier_time_ms = verifier_time_ms.round(4)
+proof_size_bits = np.trunc(proof_size_bits)
 
 # Start building LaTeX
-latex = ""
-latex += "\\begin{table}[h!]\n"
-latex += "\\centering\n"
-latex += "\\caption{Benchmark results for ZEKRA: mean proof generation, verification time, and proof size.}\n"
-latex += "\\label{tab:zekra_summary}\n"
-latex += "\\begin{tabular}{lrrr}\n"
-latex += "\\toprule\n"
-latex += "bench & proof generation (ms) & proof verification (ms) & proof size (bits) \\\\\n"
-latex += "\\midrule\n"
+lines = []
+lines.append("\\begin{table}[h!]")
+lines.append("\\centering")
+lines.append("\\caption{Benchmark results for ZEKRA: mean proof generation, verification time, and proof size.}")
+lines.append("\\label{tab:zekra_summary}")
+lines.append("\\begin{tabular}{lrrr}")
+lines.append("\\toprule")
+lines.append("bench & proof generation (ms) & proof verification (ms) & proof size (bits) \\\\")
+lines.append("\\midrule")
 
 # Add rows
-for bench, row in grouped.iterrows():
-    latex += f"{bench} & {row['prover_time_ms']} & {row['verifier_time_ms']} & {row['proof_size_bits']} \\\\\n"
+for bench, p, v, b in zip(benches, prover_time_ms, verifier_time_ms, proof_size_bits):
+    lines.append(f"{bench} & {p} & {v} & {b} \\\\")
 
-latex += "\\bottomrule\n"
-latex += "\\end{tabular}\n"
-latex += "\\end{table}\n"
+lines.append("\\bottomrule")
+lines.append("\\end{tabular}")
+lines.append("\\end{table}")
 
+latex = "\n".join(lines) + "\n"
 print(latex)
 
@@ -58,18 +58,27 @@ def mean(xs: List[float]) -> float:
 def read_rows(csv_path: Path) -> List[Row]:
     rows: List[Row] = []
     with csv_path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, [])
         required = {"bench", "prove", "verify", "proof_bytes"}
-        missing = required - set(reader.fieldnames or [])
+        missing = required - set(header)
         if missing:
             raise ValueError(f"CSV missing required columns: {sorted(missing)}")
 
+        # Column positions are looked up once; rows are plain lists
+        bench_i = header.index("bench")
+        prove_i = header.index("prove")
+        verify_i = header.index("verify")
+        bytes_i = header.index("proof_bytes")
+
         for i, r in enumerate(reader, start=2):  # header is line 1
+            if not r:
+                continue  # blank line
             try:
-                bench = str(r["bench"]).strip().strip('"')
-                prove_ms = duration_to_ms(str(r["prove"]))
-                verify_ms = duration_to_ms(str(r["verify"]))
-                proof_bytes = int(str(r["proof_bytes"]).strip().strip('"'))
+                bench = r[bench_i].strip().strip('"')
+                prove_ms = duration_to_ms(r[prove_i])
+                verify_ms = duration_to_ms(r[verify_i])
+                proof_bytes = int(r[bytes_i].strip().strip('"'))
                 proof_bits = float(proof_bytes * 8)
                 rows.append(Row(bench, prove_ms, verify_ms, proof_bits))
             except Exception as e:
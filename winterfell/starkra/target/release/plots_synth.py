@@ -30,12 +30,13 @@ def summarize(df: pd.DataFrame) -> pd.DataFrame:
 # ---------------------------------------------------------------------
 # Complexity curve helper: scale complexity curve to real data
 # ---------------------------------------------------------------------
-def scale_curve(x, curve, real_y):
+def scale_curve(curve, real_y):
     """
     Scale complexity curve so it visually matches magnitude of data.
+    Arrays are used as given, without copying.
     """
-    curve = np.array(curve)
-    real_y = np.array(real_y)
+    curve = np.asarray(curve)
+    real_y = np.asarray(real_y)
 
     # Avoid divide by zero
     if curve.max() == 0:
@@ -47,75 +48,84 @@ def scale_curve(x, curve, real_y):
 
 
 # ---------------------------------------------------------------------
-# Prove plot (with n log n)
+# Metric plots: one entry per output figure
+#   (summary column, complexity curve, line color, label, y label, title)
 # ---------------------------------------------------------------------
-def plot_prove(summary: pd.DataFrame, out_path: Path):
-    x = summary["path_len"].values
-    y = summary["mean_prove_ms"].values
-
-    # Complexity curve: n log n
-    nlogn = x * np.log2(x + 1)
-    nlogn_scaled = scale_curve(x, nlogn, y)
-
-    plt.figure()
-    plt.plot(x, y, marker="o", label="Prove time (mean, ms)")
-    plt.plot(x, nlogn_scaled, linestyle="--", label="n log n (scaled)")
-    plt.xlabel("Path length (n jumps)")
-    plt.ylabel("Prove time (ms)")
-    plt.title("Mean Prove Time vs Path Length")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
+PLOT_SPECS = {
+    "prove": ("mean_prove_ms", "nlogn", None, "Prove time (mean, ms)",
+              "Prove time (ms)", "Mean Prove Time vs Path Length"),
+    "verify": ("mean_verify_ms", "logn", "orange", "Verify time (mean, ms)",
+               "Verify time (ms)", "Mean Verify Time vs Path Length"),
+    "proof_size": ("mean_proof_bits", "logn", "green", "Proof size (bits)",
+                   "Proof size (bits)", "Mean Proof Size vs Path Length"),
+}
 
+CURVE_LABELS = {"nlogn": "n log n (scaled)", "logn": "log n (scaled)"}
 
-# ---------------------------------------------------------------------
-# Verify plot (with log n)
-# ---------------------------------------------------------------------
-def plot_verify(summary: pd.DataFrame, out_path: Path):
-    x = summary["path_len"].values
-    y = summary["mean_verify_ms"].values
 
-    # Complexity curve: log n
+def complexity_curves(x):
+    """
+    Complexity curves over the path lengths, computed once for all plots.
+    """
     logn = np.log2(x + 1)
-    logn_scaled = scale_curve(x, logn, y)
+    return {"nlogn": x * logn, "logn": logn}
+
+
+def draw_metric(ax, summary: pd.DataFrame, x, curves, name: str):
+    column, curve, color, label, ylabel, title = PLOT_SPECS[name]
+    y = summary[column].to_numpy()
 
-    plt.figure()
-    plt.plot(x, y, marker="o", color="orange", label="Verify time (mean, ms)")
-    plt.plot(x, logn_scaled, linestyle="--", label="log n (scaled)")
-    plt.xlabel("Path length (n jumps)")
-    plt.ylabel("Verify time (ms)")
-    plt.title("Mean Verify Time vs Path Length")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
+    ax.plot(x, y, marker="o", color=color, label=label)
+    ax.plot(x, scale_curve(curves[curve], y), linestyle="--", label=CURVE_LABELS[curve])
+    ax.set_xlabel("Path length (n jumps)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+    ax.legend()
+
+
+def plot_metric(summary: pd.DataFrame, name: str, out_path: Path):
+    x = summary["path_len"].to_numpy()
+    fig, ax = plt.subplots()
+    draw_metric(ax, summary, x, complexity_curves(x), name)
+    fig.tight_layout()
+    fig.savefig(out_path)
+    plt.close(fig)
 
 
 # ---------------------------------------------------------------------
-# Proof size plot (with log n)
+# All plots in one pass: one figure, redrawn and saved per metric
 # ---------------------------------------------------------------------
-def plot_proof_size(summary: pd.DataFrame, out_path: Path):
-    x = summary["path_len"].values
-    y = summary["mean_proof_bits"].values
+def plot_all(summary: pd.DataFrame, outdir: Path):
+    x = summary["path_len"].to_numpy()
+    curves = complexity_curves(x)
+
+    fig, ax = plt.subplots()
+    for name, filename in [
+        ("prove", "prove_vs_path.png"),
+        ("verify", "verify_vs_path.png"),
+        ("proof_size", "proofsize_vs_path.png"),
+    ]:
+        ax.clear()
+        draw_metric(ax, summary, x, curves, name)
+        fig.tight_layout()
+        fig.savefig(outdir / filename)
+    plt.close(fig)
+
+
+# Prove plot (with n log n)
+def plot_prove(summary: pd.DataFrame, out_path: Path):
+    plot_metric(summary, "prove", out_path)
 
-    # Complexity curve: log n
-    logn = np.log2(x + 1)
-    logn_scaled = scale_curve(x, logn, y)
 
-    plt.figure()
-    plt.plot(x, y, marker="o", color="green", label="Proof size (bits)")
-    plt.plot(x, logn_scaled, linestyle="--", label="log n (scaled)")
-    plt.xlabel("Path length (n jumps)")
-    plt.ylabel("Proof size (bits)")
-    plt.title("Mean Proof Size vs Path Length")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
+# Verify plot (with log n)
+def plot_verify(summary: pd.DataFrame, out_path: Path):
+    plot_metric(summary, "verify", out_path)
+
+
+# Proof size plot (with log n)
+def plot_proof_size(summary: pd.DataFrame, out_path: Path):
+    plot_metric(summary, "proof_size", out_path)
 
 
 # ---------------------------------------------------------------------
@@ -141,9 +151,7 @@ def main():
     summary = summarize(df)
     (outdir / "starkra_summary.csv").write_text(summary.to_csv(index=False))
 
-    plot_prove(summary, outdir / "prove_vs_path.png")
-    plot_verify(summary, outdir / "verify_vs_path.png")
-    plot_proof_size(summary, outdir / "proofsize_vs_path.png")
+    plot_all(summary, outdir)
 
     print("Generated:")
     print(" - prove_vs_path.png (with n log n)")
@@ -8,30 +8,48 @@ Analysis script for starkra benchmark:
 - Computes 2-way ANOVA:
     metric ~ C(path_len) + C(max_neighbors) + C(path_len):C(max_neighbors)
 - Checks ANOVA assumptions:
-    - Normality of residuals (Shapiro–Wilk, QQ plot, histogram)
+    - Normality of residuals (Shapiro–Wilk, or D'Agostino–Pearson for
+      more than 5000 runs; QQ plot, histogram)
     - Homoscedasticity (Levene, Bartlett)
     - Independence (Durbin–Watson)
 - Produces interaction plots for each metric.
 """
 
 import argparse
+import csv
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, redirect_stdout
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # plots are only written to files
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
-from statsmodels.formula.api import ols
+import patsy
 import statsmodels.api as sm
 
-from scipy.stats import shapiro, levene, bartlett
-from statsmodels.stats.stattools import durbin_watson
+from scipy.stats import shapiro, normaltest, levene, bartlett, f as f_dist
 
 
 # ========================= Data loading =========================
 
+FACTORS = ["path_len", "max_neighbors"]
+METRICS = ["prove_ms", "verify_ms", "proof_bits"]
+
+# Everything the analysis reads; other CSV columns are never parsed
+COLUMNS = {"n_nodes", "return_code", *FACTORS, *METRICS}
+
+
 def load_data(csv_path: Path) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+    df = pd.read_csv(
+        csv_path,
+        usecols=lambda col: col in COLUMNS,
+        dtype={metric: np.float64 for metric in METRICS},
+    )
 
     # Ensure path_len exists
     if "path_len" not in df.columns:
@@ -41,40 +59,137 @@ def load_data(csv_path: Path) -> pd.DataFrame:
     if "return_code" in df.columns:
         df = df[df["return_code"] == 0]
 
+    # Factors become integer-level categoricals once, here
+    df = df.copy()
+    for col in FACTORS:
+        if col in df.columns:
+            cat = pd.Categorical(df[col])
+            df[col] = cat.rename_categories(cat.categories.astype(np.int64))
+
     return df
 
 
 # ========================= ANOVA =========================
 
-def run_two_way_anova(df: pd.DataFrame, outdir: Path, metric: str):
+DESIGN = "C(path_len) + C(max_neighbors) + C(path_len):C(max_neighbors)"
+
+
+def _ssr(X: np.ndarray, Y: np.ndarray):
+    """
+    Least-squares fit of every column of Y on X.
+    Returns (residuals, per-column SSR, rank of X).
     """
-    Run 2-way factorial ANOVA for a given metric:
+    beta, _, rank, _ = np.linalg.lstsq(X, Y, rcond=None)
+    resid = Y - X @ beta
+    return resid, np.einsum("ij,ij->j", resid, resid), rank
+
+
+def fit_two_way_anova(df: pd.DataFrame, metrics):
+    """
+    Fit the 2-way factorial model
+        metric ~ C(path_len) + C(max_neighbors) + C(path_len):C(max_neighbors)
+    for several metrics at once and compute their Type-II ANOVA tables.
+
+    The design matrix is built once per distinct set of complete rows and
+    solved for all metrics sharing it as a multi-column response. Type-II
+    sums of squares come from the nested sub-models:
+        SS(A)  = SSR(B)     - SSR(A+B)
+        SS(B)  = SSR(A)     - SSR(A+B)
+        SS(AB) = SSR(A+B)   - SSR(A+B+AB)
+    Returns {metric: (anova_table, residuals, filtered data)}.
+    """
+    # Metrics with the same missing-value pattern share one design matrix
+    by_rows = {}
+    for metric in metrics:
+        mask = df[[metric] + FACTORS].notna().all(axis=1).to_numpy()
+        by_rows.setdefault(mask.tobytes(), (mask, []))[1].append(metric)
+
+    fits = {}
+    for mask, group in by_rows.values():
+        d = df[mask]
+
+        X = patsy.dmatrix(DESIGN, d)
+        slices = X.design_info.term_name_slices
+        X = np.asarray(X)
+        Y = d[group].to_numpy(dtype=float)
+
+        def cols(*terms):
+            return X[:, np.r_[tuple(slices[t] for t in ("Intercept",) + terms)]]
+
+        a, b, ab = "C(path_len)", "C(max_neighbors)", "C(path_len):C(max_neighbors)"
+        resid, ssr_full, rank_full = _ssr(X, Y)
+        _, ssr_ab, rank_ab = _ssr(cols(a, b), Y)
+        _, ssr_a, rank_a = _ssr(cols(a), Y)
+        _, ssr_b, rank_b = _ssr(cols(b), Y)
+
+        df_resid = len(d) - rank_full
+        ss = np.array([ssr_b - ssr_ab, ssr_a - ssr_ab, ssr_ab - ssr_full, ssr_full])
+        dof = np.array([rank_ab - rank_b, rank_ab - rank_a,
+                        rank_full - rank_ab, df_resid], dtype=float)
+        F = (ss[:3] / dof[:3, None]) / (ssr_full / df_resid)
+        pr = f_dist.sf(F, dof[:3, None], df_resid)
+
+        for j, metric in enumerate(group):
+            table = pd.DataFrame(
+                {
+                    "sum_sq": ss[:, j],
+                    "df": dof,
+                    "F": np.append(F[:, j], np.nan),
+                    "PR(>F)": np.append(pr[:, j], np.nan),
+                },
+                index=[a, b, ab, "Residual"],
+            )
+            fits[metric] = (table, resid[:, j], d)
+
+    return fits
+
+
+def run_two_way_anova(fit, outdir: Path, metric: str):
+    """
+    Report the 2-way factorial ANOVA for a given metric:
         metric ~ C(path_len) + C(max_neighbors) + C(path_len):C(max_neighbors)
     Saves ANOVA table to CSV and prints it.
-    Returns the fitted OLS model and the filtered data used.
+    Returns the model residuals and the filtered data used.
     """
     print(f"\n====== ANOVA for {metric} ======")
 
-    d = df.dropna(subset=[metric, "path_len", "max_neighbors"]).copy()
-    d["path_len"] = d["path_len"].astype(int).astype("category")
-    d["max_neighbors"] = d["max_neighbors"].astype(int).astype("category")
-
-    formula = f"{metric} ~ C(path_len) + C(max_neighbors) + C(path_len):C(max_neighbors)"
-    model = ols(formula, data=d).fit()
-    anova_table = sm.stats.anova_lm(model, typ=2)
+    anova_table, residuals, d = fit
 
     # Save table
     csv_file = outdir / f"anova_{metric}.csv"
-    anova_table.to_csv(csv_file)
+    with open(csv_file, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["", *anova_table.columns])
+        for term, *row in anova_table.itertuples():
+            writer.writerow([term, *("" if np.isnan(v) else repr(float(v)) for v in row)])
     print(f"ANOVA table saved → {csv_file}")
     print(anova_table)
 
-    return model, d
+    return residuals, d
+
+
+# ========================= Plot helpers =========================
+
+def reset_axes(ax):
+    """
+    Prepare a reused axes for the next plot: clear it and undo any
+    tight_layout applied to its figure by the previous plot.
+    """
+    ax.clear()
+    ax.figure.subplots_adjust(**{
+        side: plt.rcParams[f"figure.subplot.{side}"]
+        for side in ("left", "right", "bottom", "top")
+    })
 
 
 # ========================= Assumption checks =========================
 
-def check_anova_assumptions(model, df_metric: pd.DataFrame, metric: str, outdir: Path):
+# Above this many residuals Shapiro–Wilk gets slow and SciPy no longer
+# trusts its p-value, so the O(n) D'Agostino–Pearson test is used instead.
+SHAPIRO_MAX_N = 5000
+
+
+def check_anova_assumptions(residuals, df_metric: pd.DataFrame, metric: str, outdir: Path, ax):
     """
     Perform standard ANOVA diagnostics:
         - Normality of residuals
@@ -87,42 +202,51 @@ def check_anova_assumptions(model, df_metric: pd.DataFrame, metric: str, outdir:
     """
     print(f"\n=== Checking ANOVA Assumptions for {metric} ===")
 
-    residuals = model.resid
+    # One dense float64 buffer for every test and plot below
+    residuals = np.ascontiguousarray(residuals, dtype=np.float64)
 
     # ------------------- Normality of residuals -------------------
-    stat, p = shapiro(residuals)
-    print(f"Shapiro–Wilk normality test: p = {p:.4g}")
+    if len(residuals) > SHAPIRO_MAX_N:
+        stat, p = normaltest(residuals)
+        print(f"D'Agostino–Pearson normality test: p = {p:.4g}")
+    else:
+        stat, p = shapiro(residuals)
+        print(f"Shapiro–Wilk normality test: p = {p:.4g}")
     if p < 0.05:
         print("⚠ Residuals are NOT normally distributed (p < 0.05)")
     else:
         print("✔ Residuals appear normally distributed (p ≥ 0.05)")
 
     # QQ Plot
-    plt.figure()
-    sm.qqplot(residuals, line='45', fit=True)
-    plt.title(f"QQ Plot of Residuals ({metric})")
+    reset_axes(ax)
+    sm.qqplot(residuals, line='45', fit=True, ax=ax)
+    ax.set_title(f"QQ Plot of Residuals ({metric})")
     qq_path = outdir / f"qqplot_{metric}.png"
-    plt.savefig(qq_path)
-    plt.close()
+    ax.figure.savefig(qq_path)
     print(f"QQ plot saved → {qq_path}")
 
     # Histogram of residuals
-    plt.figure()
-    plt.hist(residuals, bins=30, density=True, alpha=0.7)
-    plt.title(f"Residual Distribution ({metric})")
+    reset_axes(ax)
+    ax.hist(residuals, bins=30, density=True, alpha=0.7)
+    ax.set_title(f"Residual Distribution ({metric})")
     hist_path = outdir / f"residual_hist_{metric}.png"
-    plt.savefig(hist_path)
-    plt.close()
+    ax.figure.savefig(hist_path)
     print(f"Residual histogram saved → {hist_path}")
 
     # ------------------- Homoscedasticity -------------------
     # Group original metric by (path_len, max_neighbors)
     # This tests equal variances across cells
-    groups = []
-    for (_, _), grp in df_metric.groupby(["path_len", "max_neighbors"]):
-        vals = grp[metric].dropna()
-        if len(vals) > 1:  # need at least two per group
-            groups.append(vals)
+    # Cell id from the categorical codes; one stable sort, then split where
+    # the id changes
+    path_codes = df_metric["path_len"].cat.codes.to_numpy(dtype=np.intp)
+    nb = df_metric["max_neighbors"].cat
+    cell = path_codes * len(nb.categories) + nb.codes.to_numpy(dtype=np.intp)
+    values = df_metric[metric].to_numpy(dtype=float)
+    ok = ~np.isnan(values)
+    order = np.argsort(cell[ok], kind="stable")
+    edges = np.flatnonzero(np.diff(cell[ok][order])) + 1
+    groups = [vals for vals in np.split(values[ok][order], edges)
+              if len(vals) > 1]  # need at least two per group
 
     if len(groups) >= 2:
         # Levene test (robust)
@@ -144,7 +268,8 @@ def check_anova_assumptions(model, df_metric: pd.DataFrame, metric: str, outdir:
         print("Not enough groups with ≥2 samples for Levene/Bartlett tests.")
 
     # ------------------- Independence -------------------
-    dw = durbin_watson(residuals)
+    diffs = np.diff(residuals)
+    dw = (diffs @ diffs) / (residuals @ residuals)
     print(f"Durbin–Watson statistic = {dw:.3f}")
     print("Interpretation:")
     print("  ≈2.0 → residuals roughly independent")
@@ -154,6 +279,21 @@ def check_anova_assumptions(model, df_metric: pd.DataFrame, metric: str, outdir:
     print("=====================================================")
 
 
+def analyze_metric(fit, outdir: Path, metric: str) -> str:
+    """
+    Worker for --jobs > 1: ANOVA report and assumption checks for one metric,
+    drawn on its own figure. Returns everything it printed so the parent can
+    emit the reports in metric order.
+    """
+    out = io.StringIO()
+    with redirect_stdout(out):
+        fig, ax = plt.subplots()
+        residuals, df_metric = run_two_way_anova(fit, outdir, metric)
+        check_anova_assumptions(residuals, df_metric, metric, outdir, ax)
+        plt.close(fig)
+    return out.getvalue()
+
+
 # ========================= Interaction plots =========================
 
 def interaction_plot_metric(df: pd.DataFrame,
@@ -163,94 +303,60 @@ def interaction_plot_metric(df: pd.DataFrame,
                             out_path: Path,
                             xlabel: str,
                             ylabel: str,
-                            title: str):
+                            title: str,
+                            ax):
     """
     Create an interaction plot:
         x-axis: levels of x_factor (numeric)
         separate lines: levels of trace_factor
         y-axis: mean(metric)
+    Returns out_path.
     """
-    d = df.dropna(subset=[metric, x_factor, trace_factor]).copy()
-    d[x_factor] = d[x_factor].astype(int)
-    d[trace_factor] = d[trace_factor].astype(int)
-
-    grouped = (
-        d.groupby([x_factor, trace_factor])[metric]
-        .mean()
-        .reset_index()
-    )
-
-    pivot = grouped.pivot(index=x_factor, columns=trace_factor, values=metric)
-    pivot = pivot.sort_index().sort_index(axis=1)
-
-    plt.figure()
-    for trace_val in pivot.columns:
-        plt.plot(
-            pivot.index,
-            pivot[trace_val],
+    d = df.dropna(subset=[metric, x_factor, trace_factor])
+
+    # Cell means via bincount on the categorical codes (empty cells stay NaN)
+    x = d[x_factor].cat.remove_unused_categories()
+    t = d[trace_factor].cat.remove_unused_categories()
+    xc, xu = x.cat.codes.to_numpy(dtype=np.intp), x.cat.categories.to_numpy()
+    tc, tu = t.cat.codes.to_numpy(dtype=np.intp), t.cat.categories.to_numpy()
+    nx, nt = len(xu), len(tu)
+    flat = xc * nt + tc
+    sums = np.bincount(flat, weights=d[metric].to_numpy(dtype=float),
+                       minlength=nx * nt).reshape(nx, nt)
+    cnts = np.bincount(flat, minlength=nx * nt).reshape(nx, nt)
+    means = np.divide(sums, cnts, out=np.full((nx, nt), np.nan), where=cnts > 0)
+
+    reset_axes(ax)
+    for j, trace_val in enumerate(tu):
+        ax.plot(
+            xu,
+            means[:, j],
             marker="o",
             label=f"{trace_factor}={trace_val}"
         )
 
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.title(title)
-    plt.grid(True)
-    plt.legend(title=trace_factor)
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
-    print(f"Interaction plot saved → {out_path}")
-
-
-# ========================= Main =========================
-
-def main():
-    parser = argparse.ArgumentParser(
-        description="Two-way ANOVA and interaction plots for starkra benchmarks."
-    )
-    parser.add_argument(
-        "csv",
-        type=str,
-        help="Input CSV file produced by bench_starkra.py"
-    )
-    parser.add_argument(
-        "--outdir",
-        type=str,
-        default="analysis_anova",
-        help="Directory to store ANOVA tables, diagnostics, and interaction plots."
-    )
-
-    args = parser.parse_args()
-    csv_path = Path(args.csv)
-    outdir = Path(args.outdir)
-    outdir.mkdir(parents=True, exist_ok=True)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+    ax.legend(title=trace_factor)
+    ax.figure.tight_layout()
+    ax.figure.savefig(out_path)
+    return out_path
 
-    # Load raw per-run data
-    df = load_data(csv_path)
 
-    # Ensure required columns exist
-    for col in ["path_len", "max_neighbors", "prove_ms", "verify_ms", "proof_bits"]:
-        if col not in df.columns:
-            raise ValueError(f"Required column '{col}' not found in CSV.")
-
-    # ---------- Two-way ANOVA + assumption checks ----------
-
-    print("\n=== Running Two-Way ANOVA and assumption checks ===")
-
-    model_prove, df_prove = run_two_way_anova(df, outdir, "prove_ms")
-    check_anova_assumptions(model_prove, df_prove, "prove_ms", outdir)
-
-    model_verify, df_verify = run_two_way_anova(df, outdir, "verify_ms")
-    check_anova_assumptions(model_verify, df_verify, "verify_ms", outdir)
-
-    model_bits, df_bits = run_two_way_anova(df, outdir, "proof_bits")
-    check_anova_assumptions(model_bits, df_bits, "proof_bits", outdir)
-
-    # ---------- Interaction plots ----------
+def save_interaction_plots(df: pd.DataFrame, outdir: Path):
+    """
+    Write all interaction plots and return their paths.
+    Uses its own Figure outside pyplot, so it can run on a worker thread
+    next to the ANOVA diagnostics.
+    """
+    fig = Figure()
+    ax = fig.subplots()
+    saved = []
 
     # 1) Metric vs path_len, separate lines for max_neighbors
-    interaction_plot_metric(
+    saved.append(interaction_plot_metric(
         df,
         x_factor="path_len",
         trace_factor="max_neighbors",
@@ -259,9 +365,10 @@ def main():
         xlabel="Path length (number of jumps)",
         ylabel="Prove time (ms)",
         title="Interaction: Prove time vs path_len × max_neighbors",
-    )
+        ax=ax,
+    ))
 
-    interaction_plot_metric(
+    saved.append(interaction_plot_metric(
         df,
         x_factor="path_len",
         trace_factor="max_neighbors",
@@ -270,9 +377,10 @@ def main():
         xlabel="Path length (number of jumps)",
         ylabel="Verify time (ms)",
         title="Interaction: Verify time vs path_len × max_neighbors",
-    )
+        ax=ax,
+    ))
 
-    interaction_plot_metric(
+    saved.append(interaction_plot_metric(
         df,
         x_factor="path_len",
         trace_factor="max_neighbors",
@@ -281,10 +389,11 @@ def main():
         xlabel="Path length (number of jumps)",
         ylabel="Proof size (bits)",
         title="Interaction: Proof size vs path_len × max_neighbors",
-    )
+        ax=ax,
+    ))
 
     # 2) Metric vs max_neighbors, separate lines for path_len
-    interaction_plot_metric(
+    saved.append(interaction_plot_metric(
         df,
         x_factor="max_neighbors",
         trace_factor="path_len",
@@ -293,9 +402,10 @@ def main():
         xlabel="Max neighbors per node",
         ylabel="Prove time (ms)",
         title="Interaction: Prove time vs max_neighbors × path_len",
-    )
+        ax=ax,
+    ))
 
-    interaction_plot_metric(
+    saved.append(interaction_plot_metric(
         df,
         x_factor="max_neighbors",
         trace_factor="path_len",
@@ -304,9 +414,10 @@ def main():
         xlabel="Max neighbors per node",
         ylabel="Verify time (ms)",
         title="Interaction: Verify time vs max_neighbors × path_len",
-    )
+        ax=ax,
+    ))
 
-    interaction_plot_metric(
+    saved.append(interaction_plot_metric(
         df,
         x_factor="max_neighbors",
         trace_factor="path_len",
@@ -315,8 +426,90 @@ def main():
         xlabel="Max neighbors per node",
         ylabel="Proof size (bits)",
         title="Interaction: Proof size vs max_neighbors × path_len",
+        ax=ax,
+    ))
+
+    return saved
+
+
+# ========================= Main =========================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Two-way ANOVA and interaction plots for starkra benchmarks."
+    )
+    parser.add_argument(
+        "csv",
+        type=str,
+        help="Input CSV file produced by bench_starkra.py"
+    )
+    parser.add_argument(
+        "--outdir",
+        type=str,
+        default="analysis_anova",
+        help="Directory to store ANOVA tables, diagnostics, and interaction plots."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of metrics whose diagnostics are produced in parallel."
     )
 
+    args = parser.parse_args()
+    if args.jobs <= 0:
+        raise ValueError("jobs must be >= 1")
+    csv_path = Path(args.csv)
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    # Load raw per-run data
+    df = load_data(csv_path)
+
+    # Ensure required columns exist
+    for col in FACTORS + METRICS:
+        if col not in df.columns:
+            raise ValueError(f"Required column '{col}' not found in CSV.")
+
+    # ---------- Two-way ANOVA + assumption checks ----------
+
+    print("\n=== Running Two-Way ANOVA and assumption checks ===")
+
+    fits = fit_two_way_anova(df, METRICS)
+
+    # Metrics are independent once fitted: with --jobs > 1 their reports
+    # come from worker processes, printed in metric order. They are
+    # submitted before the plot thread below starts, so the workers are
+    # forked from a single-threaded parent. The ExitStack shuts both
+    # executors down even if a worker raises.
+    with ExitStack() as executors:
+        reports = []
+        if args.jobs > 1:
+            pool = executors.enter_context(ProcessPoolExecutor(max_workers=args.jobs))
+            reports = [pool.submit(analyze_metric, fits[metric], outdir, metric)
+                       for metric in METRICS]
+
+        # ---------- Interaction plots ----------
+
+        # They only need the raw data, so a worker thread renders and writes
+        # them while the ANOVA diagnostics run
+        plot_pool = executors.enter_context(ThreadPoolExecutor(max_workers=1))
+        interaction_plots = plot_pool.submit(save_interaction_plots, df, outdir)
+
+        if reports:
+            for future in reports:
+                print(future.result(), end="")
+        else:
+            # One figure reused for every diagnostic plot
+            fig, ax = plt.subplots()
+            for metric in METRICS:
+                residuals, df_metric = run_two_way_anova(fits[metric], outdir, metric)
+                check_anova_assumptions(residuals, df_metric, metric, outdir, ax)
+            plt.close(fig)
+
+        for out_path in interaction_plots.result():
+            print(f"Interaction plot saved → {out_path}")
+
     print("\nDone. Results in:", outdir)
 
 
@@ -2,9 +2,8 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import statsmodels.api as sm
-from statsmodels.formula.api import ols
-from scipy.stats import shapiro, levene
+import patsy
+from scipy.stats import shapiro, levene, f as f_dist
 
 # ============================================================
 # Load data
@@ -15,6 +14,128 @@ df = pd.read_csv("starkra_results.csv")
 df['power_k'] = df['power_k'].astype(int)
 df['max_neighbors'] = df['max_neighbors'].astype(int)
 
+metrics = ["prove_ms", "verify_ms", "proof_bits"]
+
+# Factorize the (power_k, max_neighbors) cells once; ordering the rows by
+# cell id turns every group into a contiguous slice.
+cell_codes, cells = pd.MultiIndex.from_frame(
+    df[['power_k', 'max_neighbors']]).factorize(sort=True)
+cell_order = np.argsort(cell_codes, kind="stable")
+cell_bounds = np.searchsorted(cell_codes[cell_order], np.arange(len(cells) + 1))
+
+
+cell_k = cells.get_level_values(0).to_numpy()
+cell_n = cells.get_level_values(1).to_numpy()
+
+
+def cell_groups(values):
+    """Split a per-row array into one view per (power_k, max_neighbors) cell."""
+    values = values[cell_order]
+    return [values[a:b] for a, b in zip(cell_bounds[:-1], cell_bounds[1:])]
+
+
+def cell_stats(metric):
+    """
+    Per-cell mean and sample std of a metric, aligned with `cells`: bincount
+    the sums, then the squared deviations from each cell's mean (NaNs skipped).
+    """
+    values = df[metric].to_numpy(dtype=float)
+    ok = ~np.isnan(values)
+    codes, values = cell_codes[ok], values[ok]
+
+    counts = np.bincount(codes, minlength=len(cells))
+    means = np.bincount(codes, weights=values, minlength=len(cells)) / counts
+    dev = values - means[codes]
+    m2 = np.bincount(codes, weights=dev * dev, minlength=len(cells))
+    stds = np.sqrt(np.divide(m2, counts - 1, out=np.full(len(cells), np.nan),
+                             where=counts > 1))
+    return means, stds
+
+
+# log10 of every metric in one pass, split into cells once so run_anova
+# only has to run the tests and the fit
+log_values = dict(zip(metrics, np.log10(df[metrics].to_numpy(dtype=float)).T))
+log_groups = {m: cell_groups(v) for m, v in log_values.items()}
+
+
+# ============================================================
+# Shared design matrix for the two-way ANOVA
+# ============================================================
+# Every metric uses the same factor structure, so the design matrix and
+# the pseudo-inverses of its Type-II sub-models are built only once.
+
+TERMS = ["C(power_k)", "C(max_neighbors)", "C(power_k):C(max_neighbors)"]
+design = patsy.dmatrix(" + ".join(TERMS), df)
+term_slices = design.design_info.term_name_slices
+design = np.asarray(design)
+
+
+def sub_models(rows=slice(None)):
+    """(X, pinv(X), rank) for the full, additive and single-factor models."""
+    models = {}
+    for name, terms in (("full", TERMS), ("additive", TERMS[:2]),
+                        ("k", TERMS[:1]), ("n", TERMS[1:2])):
+        cols = np.r_[tuple(term_slices[t] for t in ["Intercept", *terms])]
+        X = design[rows][:, cols]
+        models[name] = (X, np.linalg.pinv(X), np.linalg.matrix_rank(X))
+    return models
+
+
+SUB_MODELS = sub_models()
+
+
+def anova_type2(y):
+    """Type-II ANOVA table for y ~ C(power_k) * C(max_neighbors)."""
+    keep = ~np.isnan(y)
+    models = SUB_MODELS if keep.all() else sub_models(keep)
+    y = y[keep]
+
+    ssr, rank = {}, {}
+    for name, (X, pinv, r) in models.items():
+        resid = y - X @ (pinv @ y)
+        ssr[name], rank[name] = resid @ resid, r
+
+    df_resid = len(y) - rank["full"]
+    sum_sq = np.array([ssr["n"] - ssr["additive"],
+                       ssr["k"] - ssr["additive"],
+                       ssr["additive"] - ssr["full"],
+                       ssr["full"]])
+    dof = np.array([rank["additive"] - rank["n"],
+                    rank["additive"] - rank["k"],
+                    rank["full"] - rank["additive"],
+                    df_resid], dtype=float)
+    F = (sum_sq[:3] / dof[:3]) / (ssr["full"] / df_resid)
+
+    return pd.DataFrame({
+        "sum_sq": sum_sq,
+        "df": dof,
+        "F": np.append(F, np.nan),
+        "PR(>F)": np.append(f_dist.sf(F, dof[:3], df_resid), np.nan),
+    }, index=TERMS + ["Residual"])
+
+# ============================================================
+# Helper: LaTeX tabular writer
+# ============================================================
+
+def write_latex_table(path, header, rows, align):
+    """
+    Write rows as a booktabs tabular in the same layout as
+    DataFrame.to_latex(float_format="%.4f").
+    """
+    def cell(v):
+        if isinstance(v, float):
+            return "NaN" if np.isnan(v) else "%.4f" % v
+        return str(v)
+
+    lines = [f"\\begin{{tabular}}{{{align}}}", "\\toprule",
+             " & ".join(header) + " \\\\", "\\midrule"]
+    lines += [" & ".join(cell(v) for v in row) + " \\\\" for row in rows]
+    lines += ["\\bottomrule", "\\end{tabular}"]
+
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
 # ============================================================
 # Helper: Run ANOVA + assumption tests
 # ============================================================
@@ -24,17 +145,17 @@ def run_anova(metric):
     print(f"ANALYZING METRIC: {metric}")
     print("====================================================\n")
 
-    df[f"log_{metric}"] = np.log10(df[metric])
-
     # ---------------------------------------------------------
     # Assumption checks
     # ---------------------------------------------------------
 
+    groups = log_groups[metric]
+
     # Shapiro–Wilk test per group
     normality_pass = True
-    for (k, n), subset in df.groupby(['power_k', 'max_neighbors']):
-        if len(subset) >= 3:
-            stat, p = shapiro(subset[f"log_{metric}"])
+    for (k, n), values in zip(cells, groups):
+        if len(values) >= 3:
+            stat, p = shapiro(values)
             if p < 0.05:
                 normality_pass = False
         else:
@@ -45,8 +166,6 @@ def run_anova(metric):
           "PASS" if normality_pass else "FAIL")
 
     # Levene’s test for variance homogeneity
-    groups = [group[f"log_{metric}"].values
-              for _, group in df.groupby(['power_k', 'max_neighbors'])]
     stat, p = levene(*groups)
     print(f"\nLevene test p={p:.4f}")
     print("Homogeneity assumption:", "PASS" if p > 0.05 else "FAIL")
@@ -54,15 +173,15 @@ def run_anova(metric):
     # ---------------------------------------------------------
     # Two–way ANOVA
     # ---------------------------------------------------------
-    model = ols(f"log_{metric} ~ C(power_k) + C(max_neighbors) + C(power_k):C(max_neighbors)", data=df).fit()
-    anova_table = sm.stats.anova_lm(model, typ=2)
+    anova_table = anova_type2(log_values[metric])
     print("\nANOVA TABLE:")
     print(anova_table)
 
     # Save as LaTeX
-    latex = anova_table.to_latex(float_format="%.4f")
-    with open(f"anova_{metric}.tex", "w") as f:
-        f.write(latex)
+    write_latex_table(f"anova_{metric}.tex",
+                      ["", *anova_table.columns],
+                      anova_table.itertuples(),
+                      "l" + "r" * len(anova_table.columns))
 
     print(f"LaTeX ANOVA table saved to anova_{metric}.tex")
 
@@ -73,21 +192,27 @@ def run_anova(metric):
 # Helper: Generate interaction plot
 # ============================================================
 
-def interaction_plot(metric):
-    plt.figure(figsize=(8, 6))
+# One figure reused for every interaction plot
+fig, ax = plt.subplots(figsize=(8, 6))
 
-    for n, group in df.groupby("max_neighbors"):
-        means = group.groupby("power_k")[metric].mean()
-        plt.plot(means.index, means.values, marker="o", label=f"neighbors={n}")
 
-    plt.xlabel("Path length exponent k (path = 2^k)")
-    plt.ylabel(metric.replace("_", " "))
-    plt.title(f"Interaction plot for {metric}")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(f"interaction_{metric}.png")
-    plt.close()
+def interaction_plot(metric):
+    means, _ = cell_stats(metric)
+    ax.clear()
+
+    # cells are sorted by (power_k, max_neighbors), so each line's k values
+    # come out in order
+    for n in np.unique(cell_n):
+        line = cell_n == n
+        ax.plot(cell_k[line], means[line], marker="o", label=f"neighbors={n}")
+
+    ax.set_xlabel("Path length exponent k (path = 2^k)")
+    ax.set_ylabel(metric.replace("_", " "))
+    ax.set_title(f"Interaction plot for {metric}")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(f"interaction_{metric}.png")
 
     print(f"Saved interaction plot: interaction_{metric}.png")
 
@@ -97,19 +222,12 @@ def interaction_plot(metric):
 # ============================================================
 
 def save_group_stats(metric):
-    group = df.groupby(['power_k', 'max_neighbors'])[metric]
-    means = group.mean()
-    stds = group.std()
-
-    table = pd.DataFrame({
-        "mean": means,
-        "std": stds
-    }).reset_index()
+    means, stds = cell_stats(metric)
 
-    latex = table.to_latex(index=False, float_format="%.4f")
-
-    with open(f"table_{metric}.tex", "w") as f:
-        f.write(latex)
+    write_latex_table(f"table_{metric}.tex",
+                      ["power_k", "max_neighbors", "mean", "std"],
+                      [(k, n, m, sd) for (k, n), m, sd in zip(cells, means, stds)],
+                      "rrrr")
 
     print(f"Saved LaTeX table: table_{metric}.tex")
 
@@ -118,12 +236,11 @@ def save_group_stats(metric):
 # Execute analysis for all three metrics
 # ============================================================
 
-metrics = ["prove_ms", "verify_ms", "proof_bits"]
-
 for m in metrics:
     interaction_plot(m)
     save_group_stats(m)
     run_anova(m)
 
+plt.close(fig)
 print("\nAll analysis complete.")
 
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import re
 import statsmodels.api as sm
 from statsmodels.formula.api import ols
 from scipy.stats import shapiro, levene
@@ -15,16 +14,42 @@ def parse_time_to_ms(s: str) -> float:
     Used for STARKRA times.
     """
     s = str(s).strip().replace('"', '')
-    m = re.match(r"([\d\.]+)\s*(ms|µs)", s)
-    if not m:
-        raise ValueError(f"Unrecognized time format: {s}")
-    value, unit = float(m.group(1)), m.group(2)
-    if unit == "ms":
-        return value
-    elif unit == "µs":
-        return value / 1000.0  # µs -> ms
+    if s.endswith("µs"):
+        scale = 1000.0  # µs -> ms
+    elif s.endswith("ms"):
+        scale = 1.0
     else:
-        raise ValueError(f"Unexpected time unit: {unit}")
+        raise ValueError(f"Unrecognized time format: {s}")
+    try:
+        return float(s[:-2]) / scale
+    except ValueError:
+        raise ValueError(f"Unrecognized time format: {s}") from None
+
+
+def parse_times_to_ms(col: pd.Series) -> np.ndarray:
+    """
+    Column-wise parse_time_to_ms: suffix checks and one float conversion of
+    the sliced column, then a single where() for the µs -> ms scaling.
+    Malformed entries are located with masks, without a per-row pass.
+    """
+    s = col.astype(str).str.strip().str.replace('"', '', regex=False)
+    is_us = s.str.endswith("µs").to_numpy()
+    value = pd.to_numeric(s.str.slice(stop=-2), errors="coerce").to_numpy(dtype=float)
+    bad = np.isnan(value) | ~(is_us | s.str.endswith("ms").to_numpy())
+    if bad.any():
+        raise ValueError(f"Unrecognized time format: {s[bad].iloc[0]}")
+    return np.where(is_us, value / 1000.0, value)
+
+
+def log10_scaled(values, factor: float = 1.0) -> np.ndarray:
+    """
+    log10(values * factor) as log10(values) + log10(factor): one log pass
+    into a fresh buffer, then an in-place shift, with no scaled temporary.
+    """
+    out = np.log10(np.asarray(values, dtype=float))
+    if factor != 1.0:
+        out += np.log10(factor)
+    return out
 
 
 def make_log_zekra(input_file="zekra.csv", output_file="log_zekra.csv") -> pd.DataFrame:
@@ -36,14 +61,15 @@ def make_log_zekra(input_file="zekra.csv", output_file="log_zekra.csv") -> pd.Da
     Output columns:
       bench, prover_time_ms, verifier_time_ms, proof_bits, system
     """
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_file,
+                     usecols=["bench", "prover_time", "verifier_time", "proof_size_bits"])
 
     df_log = pd.DataFrame({
         "bench": df["bench"],
         # convert seconds -> ms, then log10
-        "prover_time_ms": np.log10(df["prover_time"] * 1000.0),
-        "verifier_time_ms": np.log10(df["verifier_time"] * 1000.0),
-        "proof_bits": np.log10(df["proof_size_bits"]),
+        "prover_time_ms": log10_scaled(df["prover_time"], 1000.0),
+        "verifier_time_ms": log10_scaled(df["verifier_time"], 1000.0),
+        "proof_bits": log10_scaled(df["proof_size_bits"]),
         "system": "Groth16",
     })
 
@@ -61,17 +87,20 @@ def make_log_starkra(input_file="starkra.csv", output_file="log_starkra.csv") ->
     Output columns:
       bench, prover_time_ms, verifier_time_ms, proof_bits, system
     """
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_file,
+                     usecols=["bench", "prover_time", "verifier_time", "proof_bytes"],
+                     dtype={"prover_time": str, "verifier_time": str})
 
-    prover_ms = df["prover_time"].apply(parse_time_to_ms)
-    verifier_ms = df["verifier_time"].apply(parse_time_to_ms)
-    proof_bits = df["proof_bytes"] * 8
+    prover_ms = parse_times_to_ms(df["prover_time"])
+    verifier_ms = parse_times_to_ms(df["verifier_time"])
 
     df_log = pd.DataFrame({
         "bench": df["bench"],
-        "prover_time_ms": np.log10(prover_ms),
-        "verifier_time_ms": np.log10(verifier_ms),
-        "proof_bits": np.log10(proof_bits),
+        # parsed arrays are fresh, so log10 can overwrite them
+        "prover_time_ms": np.log10(prover_ms, out=prover_ms),
+        "verifier_time_ms": np.log10(verifier_ms, out=verifier_ms),
+        # bytes -> bits
+        "proof_bits": log10_scaled(df["proof_bytes"], 8),
         "system": "STARKRA",
     })
 